@@ -0,0 +1,128 @@
+import logging
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from lib.forge.gitea.branch_protections import GiteaBranchProtections
+from lib.forge.gitea.client import GiteaClient
+from lib.forge.gitea.repos import GiteaRepos
+from lib.forge.github.branch_protections import GithubBranchProtections
+from lib.forge.github.client import GithubClient
+from lib.forge.github.repos import GithubRepos
+from lib.forge.repos import PREFETCH_WORKERS
+from lib.forge.mock_server import MockForge, MockForgeServer
+from lib.logging_util import setup_logger
+
+
+def init_logger():
+    script_file_path = Path(__file__)
+    work_dir = script_file_path.parent
+    script_name = script_file_path.stem
+
+    setup_logger(
+        work_dir / "logs" / f"{script_name}.log", level=logging.WARNING
+    )
+
+
+def build_branch_protections(forge, url, jobs, cache_name):
+    client_kwargs = {
+        "base_url": url,
+        "pool_size": jobs + PREFETCH_WORKERS,
+        "cache_name": cache_name,
+    }
+
+    if forge == "gitea":
+        client = GiteaClient(**client_kwargs)
+        return GiteaBranchProtections(client, GiteaRepos(client), jobs)
+    elif forge == "github":
+        client = GithubClient(**client_kwargs)
+        repos = GithubRepos(client, username="mock")
+        return GithubBranchProtections(client, repos, jobs)
+    else:
+        raise ValueError(f"unsupported forge: {forge}")
+
+
+def run_benchmark(forge, mock_forge, jobs, cache_name, rounds):
+    with MockForgeServer(mock_forge) as server:
+        for round_idx in range(rounds):
+            branch_protections = build_branch_protections(
+                forge, server.url, jobs, cache_name
+            )
+            requests = mock_forge.requests
+            not_modified = mock_forge.not_modified
+
+            start = time.perf_counter()
+            repo_count = sum(1 for _ in branch_protections.results())
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"{forge} {repo_count} repos, {jobs} jobs, "
+                f"round {round_idx + 1}: {elapsed:.2f}s "
+                f"({repo_count / elapsed:.1f} repos/s, "
+                f"{mock_forge.requests - requests} requests, "
+                f"{mock_forge.not_modified - not_modified} not modified)"
+            )
+
+
+def main():
+    init_logger()
+
+    parser = ArgumentParser(
+        description="benchmark branch protection verification offline"
+    )
+    parser.add_argument(
+        "-f", "--forge", choices=["gitea", "github"], nargs="+",
+        default=["gitea", "github"], help="forges to simulate"
+    )
+    parser.add_argument(
+        "-r", "--repos", type=int, nargs="+", default=[100, 1000, 5000],
+        help="repo counts to benchmark"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, nargs="+", default=[8],
+        help="concurrent verification jobs to benchmark"
+    )
+    parser.add_argument(
+        "--rules-per-repo", type=int, default=2,
+        help="synthetic branch protection rules per repo"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="artificial latency in seconds per mock forge request"
+    )
+    parser.add_argument(
+        "--rate-limit", type=int, default=5000,
+        help="requests (or graphql points) allowed per rate limit window"
+    )
+    parser.add_argument(
+        "--rate-limit-window", type=int, default=3600,
+        help="seconds until the mock forge resets its rate limits"
+    )
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="use the conditional http cache and verify twice"
+    )
+    args = parser.parse_args()
+
+    for forge in args.forge:
+        for repo_count in args.repos:
+            for jobs in args.jobs:
+                mock_forge = MockForge(
+                    repo_count, rules_per_repo=args.rules_per_repo,
+                    latency=args.latency, rate_limit=args.rate_limit,
+                    rate_limit_window=args.rate_limit_window
+                )
+
+                with TemporaryDirectory() as cache_dir:
+                    cache_name = None
+                    if args.cache:
+                        cache_name = str(Path(cache_dir) / "http_cache")
+
+                    run_benchmark(
+                        forge, mock_forge, jobs, cache_name,
+                        2 if args.cache else 1
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import random
+import time
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from urllib.parse import urlencode
+from lib.cache import disable_cache
+from lib.google.transport import FixtureStore, ReplayTransport
+from lib.google.youtube.subscriptions import Subscriptions
+from lib.logging_util import setup_logger
+
+API_PATH = "/youtube/v3"
+PAGE_SIZE = 50
+
+
+def init_logger():
+    script_file_path = Path(__file__)
+    work_dir = script_file_path.parent
+    script_name = script_file_path.stem
+
+    setup_logger(
+        work_dir / "logs" / f"{script_name}.log", level=logging.WARNING
+    )
+
+
+def put_fixture(store, path, params, payload):
+    uri = f"{API_PATH}{path}?{urlencode(params)}"
+    store.put(store.key("GET", uri), 200, json.dumps(payload))
+
+
+def paginate(items, prefix):
+    pages = [
+        items[i:i + PAGE_SIZE] for i in range(0, len(items), PAGE_SIZE)
+    ] or [[]]
+
+    for n, page in enumerate(pages):
+        token = f"{prefix}-{n}" if n else None
+        next_token = f"{prefix}-{n + 1}" if n + 1 < len(pages) else None
+        yield page, token, next_token
+
+
+def generate_fixtures(store, channel_count, videos_per_channel, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    channel_ids = [f"UC{i:022d}" for i in range(channel_count)]
+
+    for page, token, next_token in paginate(channel_ids, "subscriptions"):
+        params = {
+            "part": "snippet,contentDetails",
+            "mine": "true",
+            "maxResults": PAGE_SIZE,
+        }
+        if token:
+            params["pageToken"] = token
+
+        payload = {"items": [{
+            "snippet": {
+                "resourceId": {"channelId": channel_id},
+                "title": f"Channel {channel_id}",
+                "description": f"Synthetic channel {channel_id}",
+                "thumbnails": {"default": {
+                    "url": f"https://example.com/{channel_id}.jpg"
+                }},
+            }
+        } for channel_id in page]}
+        if next_token:
+            payload["nextPageToken"] = next_token
+
+        put_fixture(store, "/subscriptions", params, payload)
+
+    for i in range(0, len(channel_ids), PAGE_SIZE):
+        batch = channel_ids[i:i + PAGE_SIZE]
+        items = [{
+            "id": channel_id,
+            "statistics": {
+                "viewCount": str(rng.randint(0, 10 ** 9)),
+                "subscriberCount": str(rng.randint(0, 10 ** 7)),
+                "videoCount": str(videos_per_channel),
+            },
+            "contentDetails": {
+                "relatedPlaylists": {"uploads": f"UU{channel_id[2:]}"}
+            },
+        } for channel_id in batch]
+
+        for part in ("statistics,contentDetails", "contentDetails"):
+            put_fixture(store, "/channels", {
+                "part": part, "id": ",".join(batch)
+            }, {"items": items})
+
+    for channel_id in channel_ids:
+        playlist_id = f"UU{channel_id[2:]}"
+        gap = timedelta(days=rng.uniform(0.5, 30))
+        published = [
+            (now - gap * n).isoformat().replace("+00:00", "Z")
+            for n in range(videos_per_channel)
+        ]
+
+        for page, token, next_token in paginate(published, playlist_id):
+            params = {
+                "part": "contentDetails",
+                "playlistId": playlist_id,
+                "maxResults": PAGE_SIZE,
+            }
+            if token:
+                params["pageToken"] = token
+
+            payload = {"items": [
+                {"contentDetails": {"videoPublishedAt": p}} for p in page
+            ]}
+            if next_token:
+                payload["nextPageToken"] = next_token
+
+            put_fixture(store, "/playlistItems", params, payload)
+
+
+def run_benchmark(store, latency, error_rate):
+    yt = Subscriptions(
+        "benchmark", None, "benchmark",
+        ReplayTransport(
+            store, latency, error_rate, seed=0,
+            error_paths=Subscriptions.RECOVERABLE_PATHS
+        )
+    )
+
+    start = time.perf_counter()
+    yt.generate_report(os.devnull, "jsonl")
+    return time.perf_counter() - start
+
+
+def main():
+    init_logger()
+
+    parser = ArgumentParser(
+        description="benchmark youtube subscription reports offline"
+    )
+    parser.add_argument(
+        "-c", "--channels", type=int, nargs="+", default=[100, 1000, 10000],
+        help="channel counts to benchmark"
+    )
+    parser.add_argument(
+        "-v", "--videos-per-channel", type=int, default=60,
+        help="synthetic uploads per channel"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="artificial latency in seconds per replayed request"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0,
+        help="fraction of replayed playlist item requests that fail with "
+             "http 503"
+    )
+    args = parser.parse_args()
+
+    disable_cache()
+
+    for channel_count in args.channels:
+        with TemporaryDirectory() as fixtures_dir:
+            store = FixtureStore(fixtures_dir)
+            generate_fixtures(store, channel_count, args.videos_per_channel)
+
+            elapsed = run_benchmark(store, args.latency, args.error_rate)
+            print(
+                f"{channel_count} channels: {elapsed:.2f}s "
+                f"({channel_count / elapsed:.1f} channels/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
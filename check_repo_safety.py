@@ -1,9 +1,16 @@
+import asyncio
+import json
 import logging
+import os
+import socket
 from argparse import ArgumentParser
-from git import Repo, InvalidGitRepositoryError
+from datetime import datetime, timezone
 from pathlib import Path
+from lib import async_git
 from lib.logging_util import setup_logger
 
+STATUS_CONFIG = {"core.untrackedCache": "true"}
+
 
 def init_logger():
     script_file_path = Path(__file__)
@@ -14,15 +21,84 @@ def init_logger():
     logging.getLogger()
 
 
-def check_repo_safety(repo: Repo, repo_name: str):
+def _ahead_count(track):
+    for part in track.split(","):
+        key, _, value = part.strip().partition(" ")
+        if key == "ahead":
+            return int(value)
+
+    return 0
+
+
+async def _unpushed_tags(repo_path, tags):
+    if not tags:
+        return []
+
+    remote_tags = set()
+    for refs in await asyncio.gather(*(
+        async_git.ls_remote(repo_path, remote, "--tags")
+        for remote in await async_git.remotes(repo_path)
+    )):
+        remote_tags.update((ref, sha) for sha, ref in refs)
+
+    return sorted(
+        name for name, object_id in tags
+        if (f"refs/tags/{name}", object_id) not in remote_tags
+    )
+
+
+async def check_repo_safety(repo_path, repo_name, status_config, detailed):
     logging.debug(f"checking repo safety for {repo_name}")
+
+    status_options = ["--branch"]
+    ref_patterns = ["refs/heads/"]
+    if detailed:
+        status_options += ["--show-stash", "--untracked-files=normal"]
+        ref_patterns.append("refs/tags/")
+    else:
+        status_options.append("--untracked-files=no")
+
+    status, refs, unpushed_commits = await asyncio.gather(
+        async_git.status(repo_path, *status_options, config=status_config),
+        async_git.for_each_ref(
+            repo_path,
+            "%(refname)\t%(upstream)\t%(upstream:track,nobracket)\t"
+            "%(objectname)",
+            *ref_patterns
+        ),
+        async_git.rev_list_count(
+            repo_path, "--branches", "--not", "--remotes"
+        ),
+    )
+
+    branches = []
+    tags = []
+    for line in refs:
+        ref, upstream, track, object_id = line.split("\t")
+        if ref.startswith("refs/heads/"):
+            branches.append((ref[len("refs/heads/"):], upstream, track))
+        else:
+            tags.append((ref[len("refs/tags/"):], object_id))
+
     repo_status = {}
+    repo_status["is_dirty"] = status["changed"] + status["unmerged"] > 0
+    repo_status["unpushed_commits"] = unpushed_commits
+    repo_status["branches_ahead"] = sum(
+        1 for _, _, track in branches if _ahead_count(track) > 0
+    )
 
-    repo_status["is_dirty"] = repo.is_dirty()
+    if detailed:
+        repo_status["stashes"] = status["stash"]
+        repo_status["untracked_files"] = status["untracked"]
+        repo_status["branches_without_upstream"] = [
+            name for name, upstream, _ in branches if not upstream
+        ]
+        repo_status["unpushed_tags"] = await _unpushed_tags(repo_path, tags)
 
-    log_output = repo.git.log('--branches', '--not', '--remotes', '--oneline')
-    repo_status["unpushed_commits"] = len(log_output.splitlines())
+    return repo_status
 
+
+def log_repo_status(repo_name, repo_status):
     if not any(repo_status.values()):
         return
 
@@ -30,6 +106,8 @@ def check_repo_safety(repo: Repo, repo_name: str):
         (
             f"{k}"
             if isinstance(v, bool)
+            else f"{k}={','.join(v)}"
+            if isinstance(v, list)
             else f"{k}={v}"
         )
         for k, v in repo_status.items()
@@ -38,18 +116,55 @@ def check_repo_safety(repo: Repo, repo_name: str):
     logging.info(f"{repo_name}: {repo_status_message}")
 
 
-def validate_repos(directory: Path):
-    for item in directory.iterdir():
-        if not item.is_dir():
-            continue
+def write_report(report_file, items, statuses):
+    repos = [
+        {"repo": item.name, "path": str(item.absolute()), **repo_status}
+        for item, repo_status in zip(items, statuses)
+    ]
 
-        try:
-            repo = Repo(item)
-        except InvalidGitRepositoryError:
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "host": socket.gethostname(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "safe_to_delete": not any(
+                "error" in repo_status or any(repo_status.values())
+                for repo_status in statuses
+            ),
+            "repos": repos,
+        }, f, indent=2)
+
+
+async def validate_repo(semaphore, item, status_config, detailed):
+    async with semaphore:
+        if not await async_git.is_repo(item):
             logging.error(f"the directory [{item}] is not a git repo")
-            continue
+            return {"error": "not a git repo"}
+
+        try:
+            return await check_repo_safety(
+                item, item.name, status_config, detailed
+            )
+        except async_git.GitError as e:
+            logging.error(f"{item.name}: unable to check repo safety: {e}")
+            return {"error": str(e)}
 
-        check_repo_safety(repo, item.name)
+
+async def validate_repos(
+    directory: Path, jobs, status_config, report_file=None
+):
+    semaphore = asyncio.Semaphore(jobs)
+    items = sorted(item for item in directory.iterdir() if item.is_dir())
+
+    statuses = await asyncio.gather(*(
+        validate_repo(semaphore, item, status_config, report_file is not None)
+        for item in items
+    ))
+    for item, repo_status in zip(items, statuses):
+        if "error" not in repo_status:
+            log_repo_status(item.name, repo_status)
+
+    if report_file is not None:
+        write_report(report_file, items, statuses)
 
 
 def main():
@@ -64,10 +179,36 @@ def main():
         type=Path,
         help="path to a directory containing all the local Git repos"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 4,
+        help="number of repos to check concurrently"
+    )
+    parser.add_argument(
+        "--fsmonitor",
+        action="store_true",
+        help="use git's builtin filesystem monitor for status checks"
+    )
+    parser.add_argument(
+        "-o",
+        "--json",
+        type=Path,
+        dest="report_file",
+        help="also check stashes, untracked files, branches without "
+             "upstreams and unpushed tags, and write a json report"
+    )
 
     args = parser.parse_args()
 
-    validate_repos(Path(args.directory))
+    status_config = dict(STATUS_CONFIG)
+    if args.fsmonitor:
+        status_config["core.fsmonitor"] = "true"
+
+    asyncio.run(validate_repos(
+        Path(args.directory), args.jobs, status_config, args.report_file
+    ))
 
 
 if __name__ == '__main__':
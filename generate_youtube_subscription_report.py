@@ -1,7 +1,9 @@
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 from pathlib import Path
 from lib.encryption.core import read_password
+from lib.google.transport import FixtureStore, RecordTransport, ReplayTransport
 from lib.logging_util import setup_logger
+from lib.google.youtube.report import REPORT_WRITERS
 from lib.google.youtube.subscriptions import Subscriptions
 
 
@@ -13,6 +15,14 @@ def init_logger():
     setup_logger(work_dir / "logs" / f"{script_name}.log")
 
 
+def positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise ArgumentTypeError(f"expected a positive integer, got {value}")
+
+    return number
+
+
 def main():
     init_logger()
 
@@ -28,13 +38,52 @@ def main():
     parser.add_argument(
         "-o", "--output", type=str, help="output file name"
     )
+    parser.add_argument(
+        "-f", "--format", choices=list(REPORT_WRITERS),
+        help="report format, inferred from the output file name by default"
+    )
+    parser.add_argument(
+        "-w", "--window", type=positive_int, action="append",
+        dest="windows",
+        help="recent video window in days (repeatable, default 7/30/90/365)"
+    )
+    transport_group = parser.add_mutually_exclusive_group()
+    transport_group.add_argument(
+        "--record", type=Path,
+        help="record api responses into this fixture directory"
+    )
+    transport_group.add_argument(
+        "--replay", type=Path,
+        help="replay api responses from this fixture directory"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="artificial latency in seconds per replayed request"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0,
+        help="fraction of replayed playlist item requests that fail with "
+             "http 503"
+    )
     args = parser.parse_args()
 
+    client_secret = None
+    transport = None
+    if args.replay:
+        transport = ReplayTransport(
+            FixtureStore(args.replay), args.latency, args.error_rate,
+            error_paths=Subscriptions.RECOVERABLE_PATHS
+        )
+    else:
+        client_secret = read_password("client secret: ")
+        if args.record:
+            transport = RecordTransport(FixtureStore(args.record))
+
     yt = Subscriptions(
-        args.client_id, read_password("client secret: "), args.project_id
+        args.client_id, client_secret, args.project_id, transport
     )
 
-    yt.generate_report(args.output)
+    yt.generate_report(args.output, args.format, args.windows)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import re
+
+PROGRESS_PATTERN = re.compile(
+    r"^(?:remote: )?(?P<phase>[A-Za-z ]+):\s+"
+    r"(?:(?P<percent>\d+)% \()?(?P<current>\d+)(?:/(?P<total>\d+))?\)?"
+    r"(?:, (?P<size>[\d.]+) (?P<unit>bytes|KiB|MiB|GiB))?"
+)
+UNITS = {"bytes": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+
+
+class GitError(Exception):
+    def __init__(self, args, returncode, stderr):
+        self.command = args
+        self.returncode = returncode
+        self.stderr = stderr
+        super().__init__(
+            f"git {' '.join(args)} failed with exit code {returncode}: "
+            f"{stderr.strip()}"
+        )
+
+
+def parse_progress(line):
+    line = line.strip()
+    match = PROGRESS_PATTERN.match(line)
+    if match is None:
+        return None
+
+    progress = {
+        "phase": match["phase"].strip(),
+        "percent": int(match["percent"]) if match["percent"] else None,
+        "current": int(match["current"]),
+        "total": int(match["total"]) if match["total"] else None,
+        "bytes": None,
+        "done": line.endswith("done."),
+    }
+    if match["size"]:
+        progress["bytes"] = int(float(match["size"]) * UNITS[match["unit"]])
+
+    return progress
+
+
+async def _read_stderr(stream, progress):
+    lines = []
+    buffer = b""
+    while chunk := await stream.read(4096):
+        buffer += chunk
+        *complete, buffer = re.split(rb"[\r\n]", buffer)
+        for raw in complete:
+            line = raw.decode("utf-8", errors="replace")
+            parsed = parse_progress(line) if progress else None
+            if parsed is not None:
+                progress(parsed)
+            elif line.strip():
+                lines.append(line)
+
+    if buffer.strip():
+        lines.append(buffer.decode("utf-8", errors="replace"))
+
+    return "\n".join(lines)
+
+
+async def git(*args, cwd=None, progress=None, check=True):
+    process = await asyncio.create_subprocess_exec(
+        "git", *args,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0", "LC_ALL": "C"},
+    )
+
+    stdout, stderr = await asyncio.gather(
+        process.stdout.read(), _read_stderr(process.stderr, progress)
+    )
+    returncode = await process.wait()
+    if check and returncode != 0:
+        raise GitError(args, returncode, stderr)
+
+    return stdout.decode("utf-8", errors="replace")
+
+
+async def is_repo(path):
+    if not os.path.isdir(path):
+        return False
+
+    try:
+        toplevel = await git("rev-parse", "--show-toplevel", cwd=path)
+    except GitError:
+        return False
+
+    return os.path.samefile(toplevel.strip(), path)
+
+
+async def is_shallow(path):
+    output = await git("rev-parse", "--is-shallow-repository", cwd=path)
+    return output.strip() == "true"
+
+
+async def clone(url, path, *options, progress=None):
+    progress_args = ("--progress",) if progress else ()
+    await git(
+        "clone", *progress_args, *options, "--", url, str(path),
+        progress=progress
+    )
+
+
+async def fetch(path, remote, *options, refspecs=None, progress=None):
+    progress_args = ("--progress",) if progress else ()
+    await git(
+        "fetch", *progress_args, *options, remote, *(refspecs or ()),
+        cwd=path, progress=progress
+    )
+
+
+async def remotes(path):
+    return (await git("remote", cwd=path)).split()
+
+
+async def ls_remote(path, remote, *options):
+    output = await git("ls-remote", *options, remote, cwd=path)
+    return [line.split("\t", 1) for line in output.splitlines()]
+
+
+async def for_each_ref(path, fmt, *patterns):
+    output = await git(
+        "for-each-ref", f"--format={fmt}", *patterns, cwd=path
+    )
+    return output.splitlines()
+
+
+def _parse_status(output):
+    status = {
+        "branch": {},
+        "stash": 0,
+        "changed": 0,
+        "unmerged": 0,
+        "untracked": 0,
+        "ignored": 0,
+    }
+
+    for line in output.splitlines():
+        if line.startswith("# branch."):
+            key, _, value = line[len("# branch."):].partition(" ")
+            status["branch"][key] = value
+        elif line.startswith("# stash "):
+            status["stash"] = int(line[len("# stash "):])
+        elif line.startswith(("1 ", "2 ")):
+            status["changed"] += 1
+        elif line.startswith("u "):
+            status["unmerged"] += 1
+        elif line.startswith("? "):
+            status["untracked"] += 1
+        elif line.startswith("! "):
+            status["ignored"] += 1
+
+    return status
+
+
+async def status(path, *options, config=None):
+    config_args = []
+    for key, value in (config or {}).items():
+        config_args += ["-c", f"{key}={value}"]
+
+    output = await git(
+        *config_args, "status", "--porcelain=v2", *options, cwd=path
+    )
+    return _parse_status(output)
+
+
+async def rev_list_count(path, *options):
+    return int(await git("rev-list", "--count", *options, cwd=path))
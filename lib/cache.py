@@ -7,6 +7,12 @@ from functools import wraps
 
 CACHE_TTL = timedelta(days=1)
 cache = Cache("temp")
+cache_enabled = True
+
+
+def disable_cache():
+    global cache_enabled
+    cache_enabled = False
 
 
 def sqlite_cache(ttl=CACHE_TTL.total_seconds()):
@@ -15,6 +21,9 @@ def sqlite_cache(ttl=CACHE_TTL.total_seconds()):
 
         @wraps(func)
         def wrapper(*args, **kwargs):
+            if not cache_enabled:
+                return func(*args, **kwargs)
+
             key_data = json.dumps({
                 "func": func.__module__ + "." + func.__qualname__,
                 "args": args,
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import time
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial=10, minimum=1, maximum=64, tolerance=0.9):
+        self.limit = max(minimum, min(initial, maximum))
+        self._minimum = minimum
+        self._maximum = maximum
+        self._tolerance = tolerance
+
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+        self._round_start = time.monotonic()
+        self._round_completed = 0
+        self._best_throughput = 0.0
+
+    def __repr__(self):
+        return (
+            f"AdaptiveLimiter(limit={self.limit}, "
+            f"in_flight={self._in_flight})"
+        )
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._in_flight < self.limit
+            )
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.record(False)
+
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _resize(self, limit, reason):
+        limit = max(self._minimum, min(limit, self._maximum))
+        if limit != self.limit:
+            logging.debug(f"concurrency {self.limit} -> {limit} ({reason})")
+            self.limit = limit
+
+        self._round_start = time.monotonic()
+        self._round_completed = 0
+
+    def record(self, success):
+        if not success:
+            self._best_throughput = 0.0
+            self._resize(self.limit // 2, "error")
+            return
+
+        self._round_completed += 1
+        if self._round_completed < self.limit:
+            return
+
+        elapsed = max(time.monotonic() - self._round_start, 1e-6)
+        throughput = self._round_completed / elapsed
+        if throughput >= self._best_throughput * self._tolerance:
+            self._best_throughput = max(self._best_throughput, throughput)
+            self._resize(self.limit + 1, f"{throughput:.2f}/s")
+        else:
+            self._resize(self.limit - 1, f"{throughput:.2f}/s dropped")
@@ -1,12 +1,162 @@
-from fnmatch import fnmatch
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import translate
+from functools import lru_cache
 from pathlib import Path
 
 
+class ExcludeMatcher:
+    def __init__(self, patterns: list[str]):
+        self.patterns = tuple(patterns)
+
+        flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+        name_patterns = {False: [], True: []}
+        path_patterns = {False: [], True: []}
+
+        for pattern in patterns:
+            if os.altsep:
+                pattern = pattern.replace(os.sep, os.altsep)
+
+            dir_only = pattern.endswith("/") and pattern != "/"
+            pattern = pattern.rstrip("/") if dir_only else pattern
+
+            if pattern.startswith("/"):
+                path_patterns[dir_only].append(translate(pattern[1:]))
+            else:
+                name_patterns[dir_only].append(translate(pattern))
+                path_patterns[dir_only].append(translate(pattern))
+
+        def compile_patterns(translated):
+            if not translated:
+                return None
+
+            return re.compile(
+                "|".join(f"(?:{p})" for p in translated), flags
+            ).match
+
+        self._name = {k: compile_patterns(v) for k, v in name_patterns.items()}
+        self._path = {k: compile_patterns(v) for k, v in path_patterns.items()}
+        self.has_dir_patterns = bool(path_patterns[True])
+
+    def __repr__(self):
+        return f"ExcludeMatcher(patterns={list(self.patterns)})"
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def matches(self, relative_path: str, is_dir: bool = False) -> bool:
+        name = relative_path.rpartition("/")[2]
+
+        for dir_only in (False, True) if is_dir else (False,):
+            name_match = self._name[dir_only]
+            if name_match is not None and name_match(name):
+                return True
+
+            path_match = self._path[dir_only]
+            if path_match is not None and path_match(relative_path):
+                return True
+
+        return False
+
+
+@lru_cache(maxsize=32)
+def compile_excludes(excludes: tuple[str, ...]) -> ExcludeMatcher:
+    return ExcludeMatcher(list(excludes))
+
+
 def is_excluded(root: Path, entry: Path, excludes: list[str]) -> bool:
+    matcher = compile_excludes(tuple(excludes))
+    if not matcher:
+        return False
+
     relative_path = entry.relative_to(root).as_posix()
+    is_dir = matcher.has_dir_patterns and entry.is_dir()
+    return matcher.matches(relative_path, is_dir)
+
+
+def _as_matcher(excludes) -> ExcludeMatcher:
+    if isinstance(excludes, ExcludeMatcher):
+        return excludes
+
+    return compile_excludes(tuple(excludes or ()))
+
+
+def _list_dir(
+    root: str,
+    relative_dir: str,
+    matcher: ExcludeMatcher,
+    follow_symlinks: bool
+) -> list[os.DirEntry]:
+    entries = []
+    with os.scandir(os.path.join(root, relative_dir)) as it:
+        for entry in it:
+            if matcher:
+                relative_path = (
+                    f"{relative_dir}/{entry.name}"
+                    if relative_dir
+                    else entry.name
+                )
+                is_dir = matcher.has_dir_patterns and entry.is_dir(
+                    follow_symlinks=follow_symlinks
+                )
+                if matcher.matches(relative_path, is_dir):
+                    continue
+
+            entries.append(entry)
+
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+
+def _subdirs(relative_dir, entries, follow_symlinks):
+    return [
+        f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+        for entry in entries
+        if entry.is_dir(follow_symlinks=follow_symlinks)
+    ]
+
+
+def walk_tree(
+    root: Path,
+    excludes=None,
+    start: str = "",
+    recursive: bool = True,
+    follow_symlinks: bool = False,
+    workers: int = 1
+):
+    root = str(root)
+    matcher = _as_matcher(excludes)
+
+    if workers <= 1:
+        pending = [start]
+        while pending:
+            relative_dir = pending.pop()
+            entries = _list_dir(root, relative_dir, matcher, follow_symlinks)
+            yield relative_dir, entries
+
+            if recursive:
+                pending.extend(reversed(
+                    _subdirs(relative_dir, entries, follow_symlinks)
+                ))
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit(relative_dir):
+            return executor.submit(
+                _list_dir, root, relative_dir, matcher, follow_symlinks
+            )
 
-    for pattern in excludes:
-        if fnmatch(entry.name, pattern) or fnmatch(relative_path, pattern):
-            return True
+        futures = {submit(start): start}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                relative_dir = futures.pop(future)
+                entries = future.result()
+                yield relative_dir, entries
 
-    return False
+                if recursive:
+                    for subdir in _subdirs(
+                        relative_dir, entries, follow_symlinks
+                    ):
+                        futures[submit(subdir)] = subdir
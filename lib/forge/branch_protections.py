@@ -1,7 +1,57 @@
+import logging
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from lib.batching import generate_batches
+from lib.forge.policy import Policy, format_finding
+from lib.forge.results import fingerprint
+from lib.futures import bounded_map
 
 
 class BranchProtections(ABC):
+    _RULE_NAME_KEY = None
+    _DEFAULT_POLICY = None
+
+    def __init__(self, client, repos, max_workers=8, policy=None):
+        self._client = client
+        self._repos = repos
+        self._max_workers = max_workers
+        self._policy = policy or Policy.load(self._DEFAULT_POLICY)
+
     @abstractmethod
-    def verify(self):
+    def _get(self, repo):
         pass
+
+    def _get_many(self, repos):
+        return [self._get(repo) for repo in repos]
+
+    def _batches(self, repos):
+        return generate_batches(repos, 1)
+
+    def _verify_repo(self, repo, protections):
+        return self._policy.evaluate(repo, protections, self._RULE_NAME_KEY)
+
+    def _verify_batch(self, repos):
+        return [
+            (
+                repo,
+                fingerprint(self._policy.digest, protections),
+                self._verify_repo(repo, protections)
+            )
+            for repo, protections in zip(repos, self._get_many(repos))
+        ]
+
+    def results(self):
+        repos = (repo["full_name"] for repo in self._repos.get())
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for results in bounded_map(
+                executor, self._verify_batch, self._batches(repos),
+                self._max_workers * 2
+            ):
+                yield from results
+
+    def verify(self):
+        for repo, _, findings in self.results():
+            logging.info(f"verified repo '{repo}'")
+            for finding in findings:
+                logging.info(format_finding(finding))
@@ -1,11 +1,87 @@
+import logging
+import requests
+import requests_cache
+import time
 from abc import ABC, abstractmethod
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lib.forge.rate_limit import RateLimiter
 
 
 class Client(ABC):
+    _RETRY_STATUSES = (500, 502, 503, 504)
+    _MAX_RATE_LIMIT_WAITS = 3
+
+    def __init__(
+        self, base_url, headers=None, verify_ssl=True, pool_size=10,
+        timeout=30, retries=3, cache_name=None
+    ):
+        self._base_url = base_url
+        self._headers = dict(headers or {})
+        self._verify_ssl = verify_ssl
+        self._timeout = timeout
+
+        self._session = self._build_session(pool_size, retries, cache_name)
+        self._rate_limiter = RateLimiter()
+
+    def _build_session(self, pool_size, retries, cache_name):
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=self._RETRY_STATUSES,
+                allowed_methods=None,
+                raise_on_status=False,
+            )
+        )
+
+        if cache_name:
+            session = requests_cache.CachedSession(
+                cache_name,
+                backend="sqlite",
+                expire_after=requests_cache.EXPIRE_IMMEDIATELY,
+                allowable_methods=("GET", "HEAD"),
+            )
+        else:
+            session = requests.Session()
+
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
     @abstractmethod
     def is_authenticated(self):
         pass
 
-    @abstractmethod
     def make_request(self, method, endpoint, **kwargs):
-        pass
+        kwargs["headers"] = {
+            **self._headers,
+            **kwargs.get("headers", {})
+        }
+        kwargs["verify"] = self._verify_ssl
+        kwargs.setdefault("timeout", self._timeout)
+
+        url = endpoint
+        if not endpoint.startswith(("http://", "https://")):
+            url = f"{self._base_url}{endpoint}"
+
+        resource = "graphql" if url.endswith("/graphql") else "core"
+        for attempt in range(self._MAX_RATE_LIMIT_WAITS + 1):
+            self._rate_limiter.wait(resource)
+            response = self._session.request(method, url, **kwargs)
+            self._rate_limiter.update(resource, response)
+
+            delay = self._rate_limiter.retry_delay(response)
+            if delay is None or attempt == self._MAX_RATE_LIMIT_WAITS:
+                break
+
+            logging.warning(
+                f"rate limited on {resource}, waiting {delay:.0f}s until reset"
+            )
+            time.sleep(delay)
+
+        response.raise_for_status()
+
+        return response
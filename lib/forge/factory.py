@@ -4,20 +4,45 @@ from lib.forge.gitea.branch_protections import GiteaBranchProtections
 from lib.forge.github.client import GithubClient
 from lib.forge.github.repos import GithubRepos
 from lib.forge.github.branch_protections import GithubBranchProtections
+from lib.forge.repos import PREFETCH_WORKERS
+
+
+HTTP_CACHE_NAME = "temp/forge_http_cache"
 
 
 class Factory:
-    def __init__(self, forge):
+    def __init__(self, forge, use_cache=True):
         self._forge = forge
+        self._cache_name = HTTP_CACHE_NAME if use_cache else None
+
+    def build_repos(self, props=None, **kwargs):
+        if self._forge == "gitea":
+            gitea_client = GiteaClient(cache_name=self._cache_name)
+            return GiteaRepos(gitea_client, props)
+        elif self._forge == "github":
+            gh_client = GithubClient(cache_name=self._cache_name)
+            return GithubRepos(gh_client, props=props, **kwargs)
+        else:
+            raise ValueError(f"unsupported forge: {self._forge}")
+
+    def build_branch_protections(self, max_workers=8, policy=None):
+        pool_size = max_workers + PREFETCH_WORKERS
 
-    def build_branch_protections(self):
         if self._forge == "gitea":
-            gitea_client = GiteaClient()
+            gitea_client = GiteaClient(
+                cache_name=self._cache_name, pool_size=pool_size
+            )
             gitea_repos = GiteaRepos(gitea_client)
-            return GiteaBranchProtections(gitea_client, gitea_repos)
+            return GiteaBranchProtections(
+                gitea_client, gitea_repos, max_workers, policy
+            )
         elif self._forge == "github":
-            gh_client = GithubClient()
+            gh_client = GithubClient(
+                cache_name=self._cache_name, pool_size=pool_size
+            )
             gh_repos = GithubRepos(gh_client, visibility="public")
-            return GithubBranchProtections(gh_client, gh_repos)
+            return GithubBranchProtections(
+                gh_client, gh_repos, max_workers, policy
+            )
         else:
             raise ValueError(f"unsupported forge: {self._forge}")
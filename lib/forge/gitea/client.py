@@ -1,5 +1,4 @@
 import os
-import requests
 import warnings
 from lib.forge.client import Client
 
@@ -11,28 +10,13 @@ GITEA_TOKEN = os.getenv("GITEA_TOKEN")
 
 
 class GiteaClient(Client):
-    def __init__(self, verify_ssl=False):
-        self._headers = {
+    def __init__(self, base_url=GITEA_HOST, verify_ssl=False, **kwargs):
+        super().__init__(base_url, {
             "Accept": "application/json",
-        }
-
-        self._verify_ssl = verify_ssl
+        }, verify_ssl=verify_ssl, **kwargs)
 
         if GITEA_TOKEN:
             self._headers["Authorization"] = f"Bearer {GITEA_TOKEN}"
 
     def is_authenticated(self):
         return "Authorization" in self._headers
-
-    def make_request(self, method, endpoint, **kwargs):
-        kwargs["headers"] = {
-            **self._headers,
-            **kwargs.get("headers", {})
-        }
-        kwargs["verify"] = self._verify_ssl
-        url = f"{GITEA_HOST}{endpoint}"
-
-        response = requests.request(method, url, **kwargs)
-        response.raise_for_status()
-
-        return response
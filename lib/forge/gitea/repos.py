@@ -1,7 +1,10 @@
+import math
 from lib.forge.repos import Repos
 
 
 class GiteaRepos(Repos):
+    _PAGE_SIZE = 50
+
     def __init__(self, client, props=None):
         self._client = client
 
@@ -9,10 +12,24 @@ class GiteaRepos(Repos):
         if self._props is None:
             self._props = ["full_name"]
 
-    def get(self):
-        response = self._client.make_request("GET", "/api/v1/user/repos")
+    def _fetch_page(self, page):
+        return self._client.make_request("GET", "/api/v1/user/repos", params={
+            "page": page,
+            "limit": self._PAGE_SIZE,
+        })
+
+    def _last_page(self, response):
+        total_count = response.headers.get("X-Total-Count")
+        if total_count is None:
+            return None
 
-        return [
-            {k: i.get(k) for k in self._props}
-            for i in response.json()
-        ]
+        page_size = len(response.json())
+        if page_size == 0:
+            return 1
+
+        return math.ceil(int(total_count) / page_size)
+
+    def get(self):
+        for response in self._iter_pages(self._fetch_page, self._last_page):
+            for i in response.json():
+                yield {k: i.get(k) for k in self._props}
@@ -1,167 +1,241 @@
-
-from lib.forge.branch_protections import BranchProtections
 import logging
+from pathlib import Path
+from lib.forge.branch_protections import BranchProtections
 
-
-class GithubBranchProtections(BranchProtections):
-    def __init__(self, client, repos):
-        self._client = client
-        self._repos = repos
-
-    def _get(self, repo):
-        url = f"/graphql"
-        owner, name = repo.split("/", 1)
-        query = """
-            query($owner: String!, $name: String!) {
-                repository(owner: $owner, name: $name) {
-                    branchProtectionRules(first: 100) {
-                        nodes {
-                            allowsDeletions
-                            allowsForcePushes
-                            blocksCreations
-                            dismissesStaleReviews
-                            isAdminEnforced
-                            lockAllowsFetchAndMerge
-                            lockBranch
-                            pattern
-                            requireLastPushApproval
-                            requiredApprovingReviewCount
-                            requiredDeploymentEnvironments
-                            requiredStatusCheckContexts
-                            requiresApprovingReviews
-                            requiresCodeOwnerReviews
-                            requiresCommitSignatures
-                            requiresConversationResolution
-                            requiresDeployments
-                            requiresLinearHistory
-                            requiresStatusChecks
-                            requiresStrictStatusChecks
-                            restrictsPushes
-                            restrictsReviewDismissals
-                            branchProtectionRuleConflicts(first: 100) { 
-                                nodes { 
-                                    conflictingBranchProtectionRule { 
-                                        pattern 
-                                    } 
-                                } 
-                            }
-                            bypassForcePushAllowances(first: 100) {
-                                nodes {
-                                    actor { 
-                                        ... on User { 
-                                            login 
-                                        } 
-                                    } 
-                                } 
-                            }
-                            bypassPullRequestAllowances(first: 100) {
-                                nodes { 
-                                    actor { 
-                                        ... on User { 
-                                            login 
-                                        } 
-                                    } 
-                                } 
-                            }
-                            pushAllowances(first: 100) { 
-                                nodes { 
-                                    actor { 
-                                        ... on User { 
-                                            login 
-                                        } 
-                                    } 
-                                } 
-                            }
-                            reviewDismissalAllowances(first: 100) { 
-                                nodes { 
-                                    actor { 
-                                        ... on User { 
-                                            login 
-                                        } 
-                                    } 
-                                } 
-                            }
-                        }
+RULE_FIELDS = """
+    nodes {
+        allowsDeletions
+        allowsForcePushes
+        blocksCreations
+        dismissesStaleReviews
+        isAdminEnforced
+        lockAllowsFetchAndMerge
+        lockBranch
+        pattern
+        requireLastPushApproval
+        requiredApprovingReviewCount
+        requiredDeploymentEnvironments
+        requiredStatusCheckContexts
+        requiresApprovingReviews
+        requiresCodeOwnerReviews
+        requiresCommitSignatures
+        requiresConversationResolution
+        requiresDeployments
+        requiresLinearHistory
+        requiresStatusChecks
+        requiresStrictStatusChecks
+        restrictsPushes
+        restrictsReviewDismissals
+        branchProtectionRuleConflicts(first: 100) {
+            nodes {
+                conflictingBranchProtectionRule {
+                    pattern
+                }
+            }
+        }
+        bypassForcePushAllowances(first: 100) {
+            nodes {
+                actor {
+                    ... on User {
+                        login
+                    }
+                }
+            }
+        }
+        bypassPullRequestAllowances(first: 100) {
+            nodes {
+                actor {
+                    ... on User {
+                        login
                     }
                 }
             }
+        }
+        pushAllowances(first: 100) {
+            nodes {
+                actor {
+                    ... on User {
+                        login
+                    }
+                }
+            }
+        }
+        reviewDismissalAllowances(first: 100) {
+            nodes {
+                actor {
+                    ... on User {
+                        login
+                    }
+                }
+            }
+        }
+    }
+"""
+
+RULES_PAGE_SIZE = 10
+NESTED_PAGE_SIZE = 100
+NESTED_CONNECTIONS = 5
+MAX_QUERY_NODES = 500000
+
+
+class GraphqlError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(
+            error.get("message", "unknown error") for error in errors
+        ) or "response has no data")
+
+
+class GithubBranchProtections(BranchProtections):
+    _RULE_NAME_KEY = "pattern"
+    _DEFAULT_POLICY = Path(__file__).with_name("policy.yaml")
+
+    def __init__(
+        self, client, repos, max_workers=8, policy=None, batch_size=50
+    ):
+        super().__init__(client, repos, max_workers, policy)
+        self._max_batch_size = batch_size
+
+        self._cost_per_repo = None
+        self._remaining = None
+
+    def _rules_selection(self, after_var=None):
+        after = f", after: ${after_var}" if after_var else ""
+        return f"""
+            branchProtectionRules(first: {RULES_PAGE_SIZE}{after}) {{
+                pageInfo {{
+                    hasNextPage
+                    endCursor
+                }}
+                {RULE_FIELDS}
+            }}
         """
-        response = self._client.make_request("POST", url, json={
+
+    def _query(self, query, variables):
+        response = self._client.make_request("POST", "/graphql", json={
             "query": query,
-            "variables": {"owner": owner, "name": name},
+            "variables": variables,
         })
 
-        return response.json()["data"]["repository"][
-            "branchProtectionRules"
-        ]["nodes"]
-
-    def _verify_repo(self, repo):
-        logging.info(f"verifying repo '{repo}'")
-
-        check_lists = {
-            "**": {
-                "allowsDeletions": False,
-                "allowsForcePushes": False,
-                "blocksCreations": False,
-                "dismissesStaleReviews": False,
-                "isAdminEnforced": True,
-                "lockAllowsFetchAndMerge": False,
-                "lockBranch": False,
-                "requireLastPushApproval": False,
-                "requiredApprovingReviewCount": None,
-                "requiredDeploymentEnvironments": [],
-                "requiredStatusCheckContexts": [],
-                "requiresApprovingReviews": False,
-                "requiresCodeOwnerReviews": False,
-                "requiresCommitSignatures": False,
-                "requiresConversationResolution": False,
-                "requiresDeployments": False,
-                "requiresLinearHistory": False,
-                "requiresStatusChecks": False,
-                "requiresStrictStatusChecks": True,
-                "restrictsPushes": False,
-                "restrictsReviewDismissals": False,
-                "branchProtectionRuleConflicts": {
-                    "nodes": []
-                },
-                "bypassForcePushAllowances": {
-                    "nodes": []
-                },
-                "bypassPullRequestAllowances": {
-                    "nodes": []
-                },
-                "pushAllowances": {
-                    "nodes": []
-                },
-                "reviewDismissalAllowances": {
-                    "nodes": []
-                }
-            }
-        }
+        body = response.json()
+        data = body.get("data")
+
+        missing = set()
+        errors = []
+        for error in body.get("errors", []):
+            path = error.get("path") or []
+            if (
+                error.get("type") == "NOT_FOUND"
+                and len(path) == 1
+                and data
+                and data.get(path[0]) is None
+            ):
+                missing.add(path[0])
+            else:
+                errors.append(error)
+
+        if data is None or errors:
+            raise GraphqlError(errors)
+
+        return data, missing
+
+    def _get(self, repo, after=None):
+        owner, name = repo.split("/", 1)
+        query = f"""
+            query($owner: String!, $name: String!, $after: String) {{
+                repository(owner: $owner, name: $name) {{
+                    {self._rules_selection("after")}
+                }}
+            }}
+        """
 
-        verified = set()
-        for protection in self._get(repo):
-            rule_name = protection.get("pattern")
-            if rule_name not in check_lists:
+        rules = []
+        while True:
+            data, missing = self._query(
+                query, {"owner": owner, "name": name, "after": after}
+            )
+            if "repository" in missing:
+                logging.warning(f"[{repo}] repository not found")
+                return rules
+
+            page = data["repository"]["branchProtectionRules"]
+            rules += page["nodes"]
+            if not page["pageInfo"]["hasNextPage"]:
+                return rules
+
+            after = page["pageInfo"]["endCursor"]
+
+    def _get_many(self, repos):
+        params = []
+        selections = []
+        variables = {}
+        for i, repo in enumerate(repos):
+            owner, name = repo.split("/", 1)
+            params.append(f"$owner{i}: String!, $name{i}: String!")
+            selections.append(f"""
+                r{i}: repository(owner: $owner{i}, name: $name{i}) {{
+                    {self._rules_selection()}
+                }}
+            """)
+            variables[f"owner{i}"] = owner
+            variables[f"name{i}"] = name
+
+        query = f"""
+            query({", ".join(params)}) {{
+                rateLimit {{
+                    cost
+                    remaining
+                }}
+                {"".join(selections)}
+            }}
+        """
+        data, missing = self._query(query, variables)
+
+        rate_limit = data.get("rateLimit")
+        if rate_limit:
+            self._cost_per_repo = rate_limit["cost"] / len(repos)
+            self._remaining = rate_limit["remaining"]
+            logging.debug(
+                f"graphql batch of {len(repos)} repos cost "
+                f"{rate_limit['cost']}, {self._remaining} remaining"
+            )
+
+        result = []
+        for i, repo in enumerate(repos):
+            if f"r{i}" in missing:
+                logging.warning(f"[{repo}] repository not found")
+                result.append([])
                 continue
 
-            verified.add(rule_name)
-            for key, expected_val in check_lists[rule_name].items():
-                actual_val = protection.get(key)
-                if actual_val == expected_val:
-                    continue
-
-                logging.info(
-                    f"[{repo}] {rule_name}: {key} is {actual_val}, expected "
-                    f"{expected_val}"
-                )
-
-        if len(verified) < len(check_lists):
-            logging.info(
-                f"[{repo}] required branch protections not found: "
-                f"{set(check_lists.keys()) - verified}"
+            page = data[f"r{i}"]["branchProtectionRules"]
+            rules = page["nodes"]
+            if page["pageInfo"]["hasNextPage"]:
+                rules += self._get(repo, page["pageInfo"]["endCursor"])
+            result.append(rules)
+
+        return result
+
+    def _batch_size(self):
+        nodes_per_repo = RULES_PAGE_SIZE * (
+            1 + NESTED_CONNECTIONS * NESTED_PAGE_SIZE
+        )
+        size = min(self._max_batch_size, MAX_QUERY_NODES // nodes_per_repo)
+
+        if self._cost_per_repo and self._remaining is not None:
+            affordable = self._remaining / (
+                self._cost_per_repo * self._max_workers
             )
+            size = min(size, int(affordable))
+
+        return max(1, size)
+
+    def _batches(self, repos):
+        batch = []
+        for repo in repos:
+            batch.append(repo)
+            if len(batch) >= self._batch_size():
+                yield batch
+                batch = []
 
-    def verify(self):
-        for repo in self._repos.get():
-            self._verify_repo(repo["full_name"])
+        if batch:
+            yield batch
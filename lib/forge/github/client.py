@@ -1,31 +1,19 @@
 import os
-import requests
 from lib.forge.client import Client
 
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
 
 class GithubClient(Client):
-    def __init__(self):
-        self._headers = {
+    def __init__(self, base_url=GITHUB_API_URL, **kwargs):
+        super().__init__(base_url, {
             "Accept": "application/json",
             "Content-Type": "application/json"
-        }
+        }, **kwargs)
 
         if GITHUB_TOKEN:
             self._headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
 
     def is_authenticated(self):
         return "Authorization" in self._headers
-
-    def make_request(self, method, endpoint, **kwargs):
-        kwargs["headers"] = {
-            **self._headers,
-            **kwargs.get("headers", {})
-        }
-        url = f"https://api.github.com{endpoint}"
-
-        response = requests.request(method, url, **kwargs)
-        response.raise_for_status()
-
-        return response
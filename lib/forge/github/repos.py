@@ -1,28 +1,46 @@
+from urllib.parse import parse_qs, urlsplit
 from lib.forge.repos import Repos
 
 
 class GithubRepos(Repos):
-    def __init__(self, client, visibility=None, username=None, props=None):
+    _PAGE_SIZE = 100
+
+    def __init__(
+        self, client, visibility=None, username=None, props=None, org=None
+    ):
         self._client = client
         self._username = username
+        self._org = org
         self._visibility = visibility
 
         self._props = props
         if self._props is None:
             self._props = ["full_name"]
 
+    def _last_page(self, response):
+        last_url = response.links.get("last", {}).get("url")
+        if last_url is None:
+            return None if "next" in response.links else 1
+
+        return int(parse_qs(urlsplit(last_url).query)["page"][0])
+
     def get(self):
         url = "/user/repos"
-        params = {}
+        params = {"per_page": self._PAGE_SIZE}
 
-        if self._username:
+        if self._org:
+            url = f"/orgs/{self._org}/repos"
+        elif self._username:
             url = f"/users/{self._username}/repos"
         elif self._client.is_authenticated():
             params["affiliation"] = "owner"
         else:
             raise ValueError("missing username for public repos")
 
-        if self._client.is_authenticated():
+        if self._org:
+            if self._visibility in ["public", "private"]:
+                params["type"] = self._visibility
+        elif self._client.is_authenticated():
             if self._visibility in ["public", "private"]:
                 params["visibility"] = self._visibility
         else:
@@ -32,16 +50,11 @@ class GithubRepos(Repos):
             "X-GitHub-Api-Version": "2022-11-28"
         }
 
-        result = []
-        while url:
-            response = self._client.make_request(
-                "GET", url, params=params, headers=headers
+        def fetch_page(page):
+            return self._client.make_request(
+                "GET", url, params={**params, "page": page}, headers=headers
             )
-            result += [
-                {k: i.get(k) for k in self._props}
-                for i in response.json()
-            ]
-
-            url = response.links.get("next", {}).get("url")
 
-        return result
+        for response in self._iter_pages(fetch_page, self._last_page):
+            for i in response.json():
+                yield {k: i.get(k) for k in self._props}
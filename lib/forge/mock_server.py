@@ -0,0 +1,332 @@
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+from ruamel.yaml import YAML
+
+FORGE_DIR = Path(__file__).parent
+
+GITEA_REPOS_PATH = "/api/v1/user/repos"
+GITEA_PROTECTIONS_PATH = re.compile(
+    r"^/api/v1/repos/([^/]+/[^/]+)/branch_protections$"
+)
+GITHUB_REPOS_PATH = re.compile(r"^/(?:user|(?:users|orgs)/[^/]+)/repos$")
+
+GRAPHQL_REPOSITORY = re.compile(
+    r"(?:(\w+):\s*)?repository\(owner:\s*\$(\w+),\s*name:\s*\$(\w+)\)"
+)
+GRAPHQL_RULES = re.compile(
+    r"branchProtectionRules\(first:\s*(\d+)(?:,\s*after:\s*\$(\w+))?\)"
+)
+GRAPHQL_NESTED_CONNECTIONS = 5
+GRAPHQL_REQUESTS_PER_POINT = 100
+
+
+def _compliant_rule(forge):
+    with open(FORGE_DIR / forge / "policy.yaml", "r", encoding="utf-8") as f:
+        return YAML(typ="safe").load(f)["rules"]["**"]
+
+
+class MockForge:
+    def __init__(
+        self, repo_count, owner="mock", rules_per_repo=1, drift_rate=0.1,
+        latency=0.0, rate_limit=5000, rate_limit_window=3600, seed=0
+    ):
+        self.repos = [f"{owner}/repo-{i:05d}" for i in range(repo_count)]
+        self.repo_names = set(self.repos)
+        self.pushed_at = "2024-01-01T00:00:00Z"
+        self.latency = latency
+
+        self._rules_per_repo = rules_per_repo
+        self._drift_rate = drift_rate
+        self._seed = seed
+        self._templates = {
+            "gitea": _compliant_rule("gitea"),
+            "github": _compliant_rule("github"),
+        }
+
+        self._rate_limit = rate_limit
+        self._rate_limit_window = rate_limit_window
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+
+    def __repr__(self):
+        return (
+            f"MockForge(repos={len(self.repos)}, "
+            f"rules_per_repo={self._rules_per_repo})"
+        )
+
+    def protections(self, forge, repo):
+        rng = random.Random(f"{self._seed}:{repo}")
+        name_key = "rule_name" if forge == "gitea" else "pattern"
+
+        rules = []
+        for i in range(self._rules_per_repo):
+            rule = dict(self._templates[forge])
+            rule[name_key] = "**" if i == 0 else f"release/{i}/*"
+            if rng.random() < self._drift_rate:
+                key = rng.choice(sorted(
+                    k for k, v in rule.items() if isinstance(v, bool)
+                ))
+                rule[key] = not rule[key]
+            rules.append(rule)
+
+        return rules
+
+    def consume(self, resource, cost=1):
+        with self._lock:
+            self.requests += 1
+
+            now = int(time.time())
+            budget = self._budgets.get(resource)
+            if budget is None or now >= budget["reset"]:
+                budget = {
+                    "remaining": self._rate_limit,
+                    "reset": now + self._rate_limit_window,
+                }
+                self._budgets[resource] = budget
+
+            allowed = budget["remaining"] >= cost
+            if allowed:
+                budget["remaining"] -= cost
+            else:
+                budget["remaining"] = 0
+                self.rate_limited += 1
+
+            return allowed, {
+                "X-RateLimit-Limit": str(self._rate_limit),
+                "X-RateLimit-Remaining": str(budget["remaining"]),
+                "X-RateLimit-Reset": str(budget["reset"]),
+                "X-RateLimit-Resource": resource,
+                "X-RateLimit-Used": str(
+                    self._rate_limit - budget["remaining"]
+                ),
+            }
+
+    def remaining(self, resource):
+        with self._lock:
+            budget = self._budgets.get(resource)
+            return self._rate_limit if budget is None else budget["remaining"]
+
+    def count_not_modified(self):
+        with self._lock:
+            self.requests += 1
+            self.not_modified += 1
+
+
+class MockForgeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def forge(self):
+        return self.server.forge
+
+    def log_message(self, format, *args):
+        logging.debug(f"mock forge: {format % args}")
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload, resource="core", cost=1, headers=None):
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json", **(headers or {})}
+
+        if self.command == "GET":
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.forge.count_not_modified()
+                self._send(304, headers={"ETag": etag})
+                return
+
+            headers["ETag"] = etag
+
+        allowed, rate_limit_headers = self.forge.consume(resource, cost)
+        headers.update(rate_limit_headers)
+        if not allowed:
+            body = json.dumps({"message": "API rate limit exceeded"})
+            self._send(403, body.encode(), rate_limit_headers)
+            return
+
+        self._send(200, body, headers)
+
+    def _not_found(self):
+        self._send(404, json.dumps({"message": "Not Found"}).encode())
+
+    def _repo(self, full_name):
+        host = self.headers.get("Host")
+        return {
+            "name": full_name.split("/", 1)[1],
+            "full_name": full_name,
+            "clone_url": f"http://{host}/{full_name}.git",
+            "ssh_url": f"git@{host.split(':')[0]}:{full_name}.git",
+            "pushed_at": self.forge.pushed_at,
+            "updated_at": self.forge.pushed_at,
+        }
+
+    def _page(self, items, page, size):
+        start = (page - 1) * size
+        return items[start:start + size]
+
+    def do_GET(self):
+        if self.forge.latency > 0:
+            time.sleep(self.forge.latency)
+
+        parts = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+
+        if parts.path == GITEA_REPOS_PATH:
+            self._gitea_repos(params)
+        elif match := GITEA_PROTECTIONS_PATH.match(parts.path):
+            self._gitea_protections(match.group(1))
+        elif GITHUB_REPOS_PATH.match(parts.path):
+            self._github_repos(parts.path, params)
+        else:
+            self._not_found()
+
+    def do_POST(self):
+        if self.forge.latency > 0:
+            time.sleep(self.forge.latency)
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if urlsplit(self.path).path == "/graphql":
+            self._github_graphql(json.loads(body))
+        else:
+            self._not_found()
+
+    def _gitea_repos(self, params):
+        page = int(params.get("page", 1))
+        limit = int(params.get("limit", 30))
+        repos = self._page(self.forge.repos, page, limit)
+
+        self._send_json([self._repo(repo) for repo in repos], headers={
+            "X-Total-Count": str(len(self.forge.repos)),
+        })
+
+    def _gitea_protections(self, repo):
+        if repo not in self.forge.repo_names:
+            self._not_found()
+            return
+
+        self._send_json(self.forge.protections("gitea", repo))
+
+    def _github_repos(self, path, params):
+        page = int(params.get("page", 1))
+        per_page = int(params.get("per_page", 30))
+        repos = self._page(self.forge.repos, page, per_page)
+
+        last = max(1, math.ceil(len(self.forge.repos) / per_page))
+        links = []
+        if page < last:
+            links.append(("next", page + 1))
+        links.append(("last", last))
+
+        host = self.headers.get("Host")
+        self._send_json([self._repo(repo) for repo in repos], headers={
+            "Link": ", ".join(
+                f'<http://{host}{path}?{urlencode({**params, "page": n})}>; '
+                f'rel="{rel}"'
+                for rel, n in links
+            ),
+        })
+
+    def _github_graphql(self, body):
+        query = body.get("query", "")
+        variables = body.get("variables") or {}
+
+        first, after_var = GRAPHQL_RULES.search(query).groups()
+        first = int(first)
+        selections = GRAPHQL_REPOSITORY.findall(query)
+
+        cost = max(1, round(len(selections) * (
+            1 + first * GRAPHQL_NESTED_CONNECTIONS
+        ) / GRAPHQL_REQUESTS_PER_POINT))
+
+        data = {}
+        errors = []
+        for alias, owner_var, name_var in selections:
+            repo = f"{variables[owner_var]}/{variables[name_var]}"
+            after = variables.get(after_var) if after_var else None
+            field = alias or "repository"
+            data[field] = self._github_rules(repo, first, after)
+            if data[field] is None:
+                errors.append({
+                    "type": "NOT_FOUND",
+                    "path": [field],
+                    "message": (
+                        f"Could not resolve to a Repository with the name "
+                        f"'{repo}'."
+                    ),
+                })
+
+        if "rateLimit" in query:
+            data["rateLimit"] = {
+                "cost": cost,
+                "remaining": max(0, self.forge.remaining("graphql") - cost),
+            }
+
+        payload = {"data": data}
+        if errors:
+            payload["errors"] = errors
+        self._send_json(payload, "graphql", cost)
+
+    def _github_rules(self, repo, first, after):
+        if repo not in self.forge.repo_names:
+            return None
+
+        rules = self.forge.protections("github", repo)
+        start = int(after) if after else 0
+        end = start + first
+
+        return {"branchProtectionRules": {
+            "pageInfo": {
+                "hasNextPage": end < len(rules),
+                "endCursor": str(end),
+            },
+            "nodes": rules[start:end],
+        }}
+
+
+class MockForgeServer:
+    def __init__(self, forge, host="127.0.0.1", port=0):
+        self._server = ThreadingHTTPServer((host, port), MockForgeHandler)
+        self._server.daemon_threads = True
+        self._server.forge = forge
+        self._thread = None
+
+    def __repr__(self):
+        return f"MockForgeServer(url={self.url})"
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,175 @@
+import json
+import re
+from fnmatch import translate
+from pathlib import Path
+from ruamel.yaml import YAML
+from lib.forge.results import fingerprint
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def _compile_matcher(expected):
+    if isinstance(expected, dict) and expected and all(
+        k.startswith("$") for k in expected
+    ):
+        checks = []
+        if "$min" in expected:
+            checks.append(
+                lambda v, m=expected["$min"]: v is not None and v >= m
+            )
+        if "$max" in expected:
+            checks.append(
+                lambda v, m=expected["$max"]: v is not None and v <= m
+            )
+        if "$in" in expected:
+            allowed = {_canonical(i) for i in expected["$in"]}
+            checks.append(lambda v: _canonical(v) in allowed)
+        if "$set" in expected:
+            wanted = {_canonical(i) for i in expected["$set"]}
+            checks.append(lambda v: (
+                isinstance(v, list) and {_canonical(i) for i in v} == wanted
+            ))
+        if "$subset" in expected:
+            wanted = {_canonical(i) for i in expected["$subset"]}
+            checks.append(lambda v: (
+                isinstance(v, list) and {_canonical(i) for i in v} <= wanted
+            ))
+
+        unknown = set(expected) - {"$min", "$max", "$in", "$set", "$subset"}
+        if unknown:
+            raise ValueError(f"unsupported policy operators: {unknown}")
+
+        return lambda v: all(check(v) for check in checks)
+
+    return lambda v: v == expected
+
+
+def _compile_rules(rules):
+    compiled = {}
+    for rule_name, settings in rules.items():
+        settings = dict(settings)
+        name_matches = None
+        if settings.pop("$glob", False):
+            name_matches = re.compile(translate(rule_name)).match
+
+        compiled[rule_name] = (name_matches, {
+            key: (_compile_matcher(expected), expected)
+            for key, expected in settings.items()
+        })
+
+    return compiled
+
+
+def _compile_globs(patterns):
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    return re.compile("|".join(f"(?:{translate(p)})" for p in patterns))
+
+
+class Policy:
+    def __init__(self, document):
+        self.digest = fingerprint(document)
+        self._rules = document.get("rules", {})
+        self._overrides = [
+            (_compile_globs(o["repos"]), o.get("rules", {}))
+            for o in document.get("overrides", [])
+        ]
+
+        self._compiled = {}
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        with open(path, "r", encoding="utf-8") as f:
+            if path.suffix.lower() == ".json":
+                return cls(json.load(f))
+
+            return cls(YAML(typ="safe").load(f))
+
+    def _rules_for(self, repo):
+        matched = tuple(
+            i for i, (pattern, _) in enumerate(self._overrides)
+            if pattern.match(repo)
+        )
+
+        compiled = self._compiled.get(matched)
+        if compiled is None:
+            rules = {k: dict(v) for k, v in self._rules.items()}
+            for i in matched:
+                for rule_name, settings in self._overrides[i][1].items():
+                    if settings is None:
+                        rules.pop(rule_name, None)
+                    else:
+                        rules.setdefault(rule_name, {}).update(settings)
+
+            compiled = _compile_rules(rules)
+            self._compiled[matched] = compiled
+
+        return compiled
+
+    def _check(self, repo, protection, rule_name, settings):
+        findings = []
+        for key, (matches, expected) in settings.items():
+            actual = protection.get(key)
+            if matches(actual):
+                continue
+
+            findings.append({
+                "repo": repo,
+                "rule": rule_name,
+                "key": key,
+                "actual": actual,
+                "expected": expected,
+            })
+
+        return findings
+
+    def evaluate(self, repo, protections, rule_name_key):
+        named = [
+            (protection.get(rule_name_key), protection)
+            for protection in protections
+            if protection.get(rule_name_key) is not None
+        ]
+
+        findings = []
+        for required, (name_matches, settings) in self._rules_for(
+            repo
+        ).items():
+            candidates = [
+                self._check(repo, protection, rule_name, settings)
+                for rule_name, protection in named
+                if (
+                    name_matches(rule_name)
+                    if name_matches is not None
+                    else rule_name == required
+                )
+            ]
+
+            if candidates:
+                findings += min(candidates, key=len)
+            else:
+                findings.append({
+                    "repo": repo,
+                    "rule": required,
+                    "key": None,
+                    "actual": None,
+                    "expected": "present",
+                })
+
+        return findings
+
+
+def format_finding(finding):
+    if finding["key"] is None:
+        return (
+            f"[{finding['repo']}] required branch protection not found: "
+            f"{finding['rule']}"
+        )
+
+    return (
+        f"[{finding['repo']}] {finding['rule']}: {finding['key']} is "
+        f"{finding['actual']}, expected {finding['expected']}"
+    )
@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    try:
+        return max(0, int(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0, retry_at.timestamp() - time.time())
+
+
+class RateLimiter:
+    def __init__(self, pace_below=0.1, reserve=0):
+        self._pace_below = pace_below
+        self._reserve = reserve
+
+        self._lock = threading.Lock()
+        self._budgets = {}
+        self._next_slot = {}
+
+    def wait(self, resource):
+        with self._lock:
+            budget = self._budgets.get(resource)
+            if budget is None:
+                return
+
+            now = time.time()
+            if now >= budget["reset"]:
+                del self._budgets[resource]
+                self._next_slot.pop(resource, None)
+                return
+
+            delay = 0
+            window = budget["reset"] - now
+            usable = budget["remaining"] - self._reserve
+            if usable <= 0:
+                delay = window
+            elif budget["remaining"] < budget["limit"] * self._pace_below:
+                slot = max(now, self._next_slot.get(resource, now))
+                self._next_slot[resource] = slot + window / usable
+                delay = slot - now
+
+            budget["remaining"] -= 1
+
+        if delay > 0:
+            logging.debug(f"pacing {resource} requests, waiting {delay:.1f}s")
+            time.sleep(delay)
+
+    def update(self, resource, response):
+        if getattr(response, "from_cache", False):
+            return
+
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+
+        resource = headers.get("X-RateLimit-Resource", resource)
+        with self._lock:
+            self._budgets[resource] = {
+                "limit": int(headers.get("X-RateLimit-Limit", remaining)),
+                "remaining": int(remaining),
+                "reset": int(reset),
+            }
+
+    def retry_delay(self, response):
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return delay
+
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = int(response.headers.get("X-RateLimit-Reset", 0))
+            return max(0, reset - time.time()) + 1
+
+        return None
@@ -1,7 +1,34 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from lib.futures import bounded_map
+
+PREFETCH_WORKERS = 4
 
 
 class Repos(ABC):
+    _PREFETCH_WORKERS = PREFETCH_WORKERS
+
     @abstractmethod
     def get(self):
         pass
+
+    def _iter_pages(self, fetch_page, last_page):
+        response = fetch_page(1)
+        yield response
+
+        last = last_page(response)
+        if last is None:
+            page = 2
+            while response.json():
+                response = fetch_page(page)
+                yield response
+                page += 1
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=self._PREFETCH_WORKERS
+        ) as executor:
+            yield from bounded_map(
+                executor, fetch_page, range(2, last + 1),
+                self._PREFETCH_WORKERS
+            )
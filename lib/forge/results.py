@@ -0,0 +1,109 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def fingerprint(*values):
+    data = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _finding_key(finding):
+    return (finding["rule"], finding["key"], fingerprint(finding["actual"]))
+
+
+def diff_findings(previous, current):
+    previous_keys = {_finding_key(f) for f in previous}
+    current_keys = {_finding_key(f) for f in current}
+
+    added = [f for f in current if _finding_key(f) not in previous_keys]
+    resolved = [f for f in previous if _finding_key(f) not in current_keys]
+    return added, resolved
+
+
+class ResultsStore:
+    def __init__(self, path):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                forge TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                repo TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                findings TEXT NOT NULL,
+                PRIMARY KEY (run_id, repo)
+            );
+        """)
+
+    def __repr__(self):
+        return f"ResultsStore(path={self._path})"
+
+    def latest(self, forge):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM runs WHERE forge = ? AND completed = 1 "
+                "ORDER BY id DESC LIMIT 1", (forge,)
+            ).fetchone()
+            if row is None:
+                return {}
+
+            return {
+                repo: (repo_fingerprint, json.loads(findings))
+                for repo, repo_fingerprint, findings in self._conn.execute(
+                    "SELECT repo, fingerprint, findings FROM results "
+                    "WHERE run_id = ?", row
+                )
+            }
+
+    def begin(self, forge):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (forge, started_at) VALUES (?, ?)",
+                (forge, datetime.now(timezone.utc).isoformat())
+            )
+            return cursor.lastrowid
+
+    def record(self, run_id, repo, repo_fingerprint, findings):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (run_id, repo, repo_fingerprint, json.dumps(findings))
+            )
+
+    def complete(self, run_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET completed = 1 WHERE id = ?", (run_id,)
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+class JsonLinesWriter:
+    def __init__(self, out_file):
+        self._out_file = out_file
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._out_file, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file.close()
+
+    def write(self, record):
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
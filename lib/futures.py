@@ -3,6 +3,7 @@ import os
 import shutil
 import time
 import sys
+from collections import deque
 
 
 def clear_temp():
@@ -47,3 +48,14 @@ def await_futures(executor, function, round, rounds, round_idx,
 
     if (half_rounds := rounds / 2) <= rounds <= half_rounds + 1:
         clear_temp()
+
+
+def bounded_map(executor, function, iterable, max_in_flight):
+    futures = deque()
+    for item in iterable:
+        futures.append(executor.submit(function, item))
+        if len(futures) >= max_in_flight:
+            yield futures.popleft().result()
+
+    while futures:
+        yield futures.popleft().result()
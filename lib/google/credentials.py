@@ -0,0 +1,99 @@
+import logging
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta, timezone
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google_auth_oauthlib.flow import InstalledAppFlow
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+REFRESH_MARGIN = timedelta(minutes=5)
+
+
+class CredentialsManager:
+    def __init__(self, scopes, token_cache, client_config, port=80):
+        self._scopes = scopes
+        self._token_cache = Path(token_cache)
+        self._client_config = client_config
+        self._port = port
+
+        self._creds = None
+        self._lock = threading.Lock()
+
+    def _should_refresh(self, creds):
+        if creds.expiry is None or not creds.refresh_token:
+            return False
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - REFRESH_MARGIN <= now
+
+    def get(self):
+        creds = self._creds
+        if creds is not None and creds.valid:
+            if (
+                self._should_refresh(creds) and
+                self._lock.acquire(blocking=False)
+            ):
+                try:
+                    if self._should_refresh(creds):
+                        self._refresh(creds)
+                except RefreshError as e:
+                    logging.warning(f"unable to refresh credentials: {e}")
+                finally:
+                    self._lock.release()
+
+            return self._creds
+
+        with self._lock:
+            return self._load()
+
+    def _load(self):
+        creds = self._creds
+        if creds is None and self._token_cache.exists():
+            logging.debug(f"cache hit for credentials at {self._token_cache}")
+            with open(self._token_cache, "rb") as f:
+                creds = pickle.load(f)
+
+        if (
+            creds is not None and creds.valid and
+            not self._should_refresh(creds)
+        ):
+            logging.debug(f"valid credentials, not updating cache")
+            self._creds = creds
+            return creds
+
+        if creds is not None and creds.refresh_token:
+            try:
+                self._refresh(creds)
+                return self._creds
+            except RefreshError as e:
+                logging.warning(f"unable to refresh credentials: {e}")
+
+        logging.info("invalid or empty credentials, logging in...")
+        flow = InstalledAppFlow.from_client_config(
+            self._client_config, self._scopes
+        )
+        creds = flow.run_local_server(port=self._port)
+
+        self._persist(creds)
+        self._creds = creds
+        logging.info("initialized google credentials")
+        return creds
+
+    def _refresh(self, creds):
+        logging.info("credentials expiring, refreshing...")
+        creds.refresh(Request())
+
+        self._persist(creds)
+        self._creds = creds
+
+    def _persist(self, creds):
+        logging.debug(f"caching token at {self._token_cache}")
+        with NamedTemporaryFile(
+            mode="wb", dir=self._token_cache.parent.absolute(),
+            delete=False, suffix=".tmp"
+        ) as f:
+            pickle.dump(creds, f)
+        os.replace(f.name, self._token_cache)
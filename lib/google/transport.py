@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.http import build_http
+from httplib2 import Response
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from urllib.parse import parse_qsl, urlsplit
+
+
+class FixtureStore:
+    _IGNORED_PARAMS = {"alt", "key"}
+
+    def __init__(self, directory):
+        self._directory = Path(directory)
+
+    def __repr__(self):
+        return f"FixtureStore(directory={self._directory})"
+
+    def key(self, method, uri, body=None):
+        parts = urlsplit(uri)
+        params = sorted(
+            (k, v) for k, v in parse_qsl(parts.query)
+            if k not in self._IGNORED_PARAMS
+        )
+        key_data = json.dumps({
+            "method": method.upper(),
+            "path": parts.path,
+            "params": params,
+            "body": body,
+        }, sort_keys=True, default=str)
+
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def _path(self, key):
+        return self._directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, status, content, headers=None):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+
+        with NamedTemporaryFile(
+            mode="w", encoding="utf-8", dir=path.parent, delete=False,
+            suffix=".tmp"
+        ) as f:
+            json.dump({
+                "status": status,
+                "headers": headers or {},
+                "content": content,
+            }, f)
+        os.replace(f.name, path)
+
+
+class RecordingHttp:
+    def __init__(self, http, store):
+        self._http = http
+        self._store = store
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        response, content = self._http.request(
+            uri, method=method, body=body, headers=headers, **kwargs
+        )
+
+        logging.debug(f"recording response for {method} {uri}")
+        self._store.put(
+            self._store.key(method, uri, body),
+            response.status,
+            content,
+            {k: v for k, v in response.items() if not k.startswith("-")}
+        )
+
+        return response, content
+
+
+class ReplayHttp:
+    def __init__(
+        self, store, latency=0.0, error_rate=0.0, seed=None, error_paths=None
+    ):
+        self._store = store
+        self._latency = latency
+        self._error_rate = error_rate
+        self._error_paths = tuple(error_paths) if error_paths else None
+        self._random = random.Random(seed)
+
+    def _inject_error(self, uri):
+        if self._error_paths is not None and not urlsplit(
+            uri
+        ).path.endswith(self._error_paths):
+            return False
+
+        return self._random.random() < self._error_rate
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if self._latency > 0:
+            time.sleep(self._latency)
+
+        if self._inject_error(uri):
+            logging.debug(f"injecting error for {method} {uri}")
+            return Response({"status": 503}), json.dumps({
+                "error": {"code": 503, "message": "injected error"}
+            }).encode()
+
+        fixture = self._store.get(self._store.key(method, uri, body))
+        if fixture is None:
+            raise LookupError(f"no recorded response for {method} {uri}")
+
+        return (
+            Response({**fixture["headers"], "status": fixture["status"]}),
+            fixture["content"].encode("utf-8")
+        )
+
+
+class Transport(ABC):
+    @abstractmethod
+    def build_http(self, get_creds):
+        pass
+
+
+class RecordTransport(Transport):
+    def __init__(self, store):
+        self._store = store
+
+    def __repr__(self):
+        return f"RecordTransport(store={self._store})"
+
+    def build_http(self, get_creds):
+        return RecordingHttp(
+            AuthorizedHttp(get_creds(), http=build_http()), self._store
+        )
+
+
+class ReplayTransport(Transport):
+    def __init__(
+        self, store, latency=0.0, error_rate=0.0, seed=None, error_paths=None
+    ):
+        self._store = store
+        self._http = ReplayHttp(store, latency, error_rate, seed, error_paths)
+
+    def __repr__(self):
+        return f"ReplayTransport(store={self._store})"
+
+    def build_http(self, get_creds):
+        return self._http
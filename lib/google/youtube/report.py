@@ -0,0 +1,212 @@
+import csv
+import json
+import logging
+import re
+import sys
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from lib.workbook import TableWriter
+
+
+class ReportWriter(ABC):
+    FORMAT = None
+
+    def __init__(self, out_file, columns):
+        self._out_file = out_file
+        self._columns = columns
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @abstractmethod
+    def open(self):
+        pass
+
+    @abstractmethod
+    def write_row(self, row):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class _TextReportWriter(ReportWriter):
+    def open(self):
+        if self._out_file is None:
+            logging.info(f"writing {self.FORMAT} report to stdout...")
+            self._stream = sys.stdout
+        else:
+            logging.info(
+                f"writing {self.FORMAT} report to {self._out_file}..."
+            )
+            self._stream = open(
+                Path(self._out_file), "w", encoding="utf-8", newline=""
+            )
+
+        self._write_header()
+
+    def write_row(self, row):
+        self._write_row(row)
+        self._stream.flush()
+
+    def close(self):
+        self._stream.flush()
+        if self._stream is not sys.stdout:
+            self._stream.close()
+
+    @abstractmethod
+    def _write_header(self):
+        pass
+
+    @abstractmethod
+    def _write_row(self, row):
+        pass
+
+
+class MarkdownReportWriter(_TextReportWriter):
+    FORMAT = "markdown"
+
+    _HIDDEN_COLUMNS = {"channel_id"}
+
+    def __init__(self, out_file, columns):
+        super().__init__(out_file, {
+            k: v for k, v in columns.items() if k not in self._HIDDEN_COLUMNS
+        })
+
+        self._formatters = {
+            "thumbnail": lambda r: (
+                f"![{r['channel_title']}]({r['thumbnail']})"
+            ),
+            "channel_title": lambda r: self._clean_text(r["channel_title"]),
+            "description": lambda r: self._clean_text(
+                r["description"].replace("\n", " ")[:80] + "..."
+            ),
+            "view_count": lambda r: f"{r['view_count']:,}",
+            "subscriber_count": lambda r: f"{r['subscriber_count']:,}",
+            "last_video_date": lambda r: self._relative_date(
+                r["last_video_date"]
+            ),
+        }
+
+    def _format_value(self, value):
+        return "" if value is None else str(value)
+
+    def _clean_text(self, text):
+        text = re.sub(r"\s+", " ", text.strip())
+        text = text[:77] + "..." if len(text) > 80 else text
+        text = text.replace("|", r"\|")
+        return text
+
+    def _relative_date(self, date):
+        try:
+            last_video = datetime.fromisoformat(date)
+        except ValueError:
+            last_video = datetime.fromtimestamp(0, tz=timezone.utc)
+        days = (datetime.now(timezone.utc) - last_video).days
+
+        if days == 0:
+            return "Today"
+        elif days < 7:
+            return f"{days}d ago"
+        elif days < 30:
+            return f"{days // 7}w ago"
+        elif days < 365:
+            return f"{days // 30}mo ago"
+        else:
+            return f"{days // 365}y ago"
+
+    def _write_header(self):
+        headers = list(self._columns.values())
+        self._stream.write(f"| {' | '.join(headers)} |\n")
+        self._stream.write(f"| {' | '.join(['---'] * len(headers))} |\n")
+
+    def _write_row(self, row):
+        cells = [
+            self._formatters[k](row)
+            if k in self._formatters
+            else self._format_value(row[k])
+            for k in self._columns
+        ]
+        self._stream.write(f"| {' | '.join(cells)} |\n")
+
+
+class CsvReportWriter(_TextReportWriter):
+    FORMAT = "csv"
+
+    def _write_header(self):
+        self._writer = csv.DictWriter(
+            self._stream, fieldnames=list(self._columns),
+            extrasaction="ignore"
+        )
+        self._writer.writeheader()
+
+    def _write_row(self, row):
+        self._writer.writerow(row)
+
+
+class JsonLinesReportWriter(_TextReportWriter):
+    FORMAT = "jsonl"
+
+    def _write_header(self):
+        pass
+
+    def _write_row(self, row):
+        self._stream.write(
+            json.dumps({k: row.get(k) for k in self._columns}) + "\n"
+        )
+
+
+class XlsxReportWriter(ReportWriter):
+    FORMAT = "xlsx"
+
+    def open(self):
+        if self._out_file is None:
+            raise ValueError("an output file is required for xlsx reports")
+
+        logging.info(f"writing xlsx report to {self._out_file}...")
+        self._table = TableWriter(
+            self._out_file, "YouTube Subscriptions",
+            list(self._columns.values())
+        )
+
+    def write_row(self, row):
+        self._table.append([row.get(k) for k in self._columns])
+
+    def close(self):
+        self._table.save()
+
+
+REPORT_WRITERS = {
+    writer.FORMAT: writer
+    for writer in (
+        MarkdownReportWriter,
+        CsvReportWriter,
+        JsonLinesReportWriter,
+        XlsxReportWriter,
+    )
+}
+
+_SUFFIX_FORMATS = {
+    ".md": "markdown",
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".xlsx": "xlsx",
+}
+
+
+def build_report_writer(out_file, columns, fmt=None):
+    if fmt is None and out_file is not None:
+        fmt = _SUFFIX_FORMATS.get(Path(out_file).suffix.lower())
+    if fmt is None:
+        fmt = "markdown"
+
+    if fmt not in REPORT_WRITERS:
+        raise ValueError(f"unsupported report format: {fmt}")
+
+    return REPORT_WRITERS[fmt](out_file, columns)
@@ -1,25 +1,34 @@
-import json
 import logging
-import pickle
-import re
-import threading
-from bisect import bisect_left
-from datetime import datetime, timezone, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+from bisect import bisect_right
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from pathlib import Path
-from tempfile import NamedTemporaryFile
+from statistics import median
 from lib.cache import sqlite_cache
+from lib.futures import bounded_map
+from lib.google.credentials import CredentialsManager
+from lib.google.youtube.report import build_report_writer
 
 
 logging.getLogger("googleapiclient.discovery_cache").setLevel(logging.ERROR)
 
 
 class Subscriptions:
-    def __init__(self, client_id, client_secret, project_id):
+    _REPORT_COLUMNS = {
+        "channel_id": "Channel ID",
+        "thumbnail": "Thumbnail",
+        "channel_title": "Channel",
+        "description": "Description",
+        "view_count": "Views",
+        "subscriber_count": "Subscribers",
+        "video_count": "Videos",
+    }
+    _DEFAULT_WINDOWS = (7, 30, 90, 365)
+    RECOVERABLE_PATHS = ("/youtube/v3/playlistItems",)
+
+    def __init__(self, client_id, client_secret, project_id, transport=None):
         self._SCOPES = ['https://www.googleapis.com/auth/youtube.readonly']
         self._TOKEN_CACHE = Path("youtube-token.pkl")
         self._CRED_FILE_WEB_CONTENTS = {
@@ -33,71 +42,45 @@ class Subscriptions:
             ]
         }
         self._PAGE_SIZE = 50
+        self._NUM_RETRIES = 5
 
         self._client_id = client_id
         self._client_secret = client_secret
         self._project_id = project_id
-
-        self._creds = None
-        self._creds_lock = threading.Lock()
+        self._transport = transport
+
+        self._credentials = CredentialsManager(
+            self._SCOPES, self._TOKEN_CACHE, {
+                "web": {
+                    **(self._CRED_FILE_WEB_CONTENTS),
+                    "client_id": self._client_id,
+                    "client_secret": self._client_secret,
+                    "project_id": self._project_id
+                }
+            }
+        )
 
     def __repr__(self):
+        if self._transport is not None:
+            return (
+                f"YouTubeContext(project_id={self._project_id}, "
+                f"transport={self._transport})"
+            )
+
         return (
             f"YouTubeContext(project_id={self._project_id})"
         )
 
     @property
     def creds(self):
-        with self._creds_lock:
-            if self._creds is None and self._TOKEN_CACHE.exists():
-                logging.debug(
-                    f"cache hit for credentials at {self._TOKEN_CACHE}"
-                )
-                with open(self._TOKEN_CACHE, "rb") as f:
-                    self._creds = pickle.load(f)
-
-            if (
-                self._creds is not None and self._creds.valid and
-                not self._creds.expired
-            ):
-                logging.debug(f"valid credentials, not updating cache")
-                return self._creds
-
-            if self._creds is None or not self._creds.valid:
-                logging.info("invalid or empty credentials, logging in...")
-                cred_file_contents = {
-                    "web": {
-                        **(self._CRED_FILE_WEB_CONTENTS),
-                        "client_id": self._client_id,
-                        "client_secret": self._client_secret,
-                        "project_id": self._project_id
-                    }
-                }
-
-                with NamedTemporaryFile(
-                    mode='w', delete=False, suffix='.json'
-                ) as f:
-                    f.write(json.dumps(cred_file_contents))
-                    credential_file = f.name
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    credential_file, self._SCOPES
-                )
-                self._creds = flow.run_local_server(port=80)
-
-                Path(credential_file).unlink()
-
-            if self._creds.expired and self._creds.refresh_token:
-                logging.info("credentials expired, refreshing...")
-                self._creds.refresh(Request())
-
-            logging.debug(f"caching token at {self._TOKEN_CACHE}")
-            with open(self._TOKEN_CACHE, "wb") as f:
-                pickle.dump(self._creds, f)
-
-            logging.info("initialized google credentials")
-            return self._creds
+        return self._credentials.get()
 
     def _get_client(self):
+        if self._transport is not None:
+            return build('youtube', 'v3', http=self._transport.build_http(
+                lambda: self.creds
+            ))
+
         return build('youtube', 'v3', credentials=self.creds)
 
     @sqlite_cache()
@@ -111,7 +94,7 @@ class Subscriptions:
                 part='snippet,contentDetails', mine=True,
                 maxResults=self._PAGE_SIZE, pageToken=next_page_token
             )
-            response = request.execute()
+            response = request.execute(num_retries=self._NUM_RETRIES)
 
             for item in response.get('items', []):
                 subscriptions.append({
@@ -142,7 +125,7 @@ class Subscriptions:
             request = self._get_client().channels().list(
                 part='statistics,contentDetails', id=','.join(batch)
             )
-            response = request.execute()
+            response = request.execute(num_retries=self._NUM_RETRIES)
 
             for item in response.get('items', []):
                 channel_id = item['id']
@@ -171,7 +154,7 @@ class Subscriptions:
             response = self._get_client().channels().list(
                 part="contentDetails",
                 id=",".join(batch)
-            ).execute()
+            ).execute(num_retries=self._NUM_RETRIES)
             for item in response.get("items", []):
                 result[item["id"]] = (
                     item["contentDetails"]["relatedPlaylists"]["uploads"]
@@ -184,8 +167,7 @@ class Subscriptions:
         logging.info(f"fetching recent videos for playlist {playlist_id}...")
 
         try:
-            since = datetime.fromisoformat(since)
-            videos = {playlist_id: []}
+            published = []
             next_page_token = None
 
             while True:
@@ -196,19 +178,17 @@ class Subscriptions:
                     pageToken=next_page_token
                 ).execute()
 
-                items = sorted((
-                    datetime.fromisoformat(
-                        i["contentDetails"]["videoPublishedAt"]
-                    ) for i in response.get("items", [])
-                ), reverse=True)
-
-                cutoff = bisect_left(
-                    [-t.timestamp() for t in items], -since.timestamp()
-                )
-                videos[playlist_id].extend(
-                    {"published_at": item} for item in items[:cutoff]
-                )
-                if cutoff < len(items):
+                reached_cutoff = False
+                for item in response.get("items", []):
+                    timestamp = int(datetime.fromisoformat(
+                        item["contentDetails"]["videoPublishedAt"]
+                    ).timestamp())
+                    if timestamp > since:
+                        published.append(timestamp)
+                    else:
+                        reached_cutoff = True
+
+                if reached_cutoff:
                     break
 
                 next_page_token = response.get("nextPageToken")
@@ -219,10 +199,7 @@ class Subscriptions:
                     f"next page for playlist {playlist_id}: {next_page_token}"
                 )
 
-            videos[playlist_id].sort(
-                key=lambda x: -x["published_at"].timestamp()
-            )
-            return videos
+            return {playlist_id: published}
 
         except HttpError:
             logging.warning(
@@ -230,133 +207,88 @@ class Subscriptions:
             )
             return {playlist_id: []}
 
-    def _get_recent_video_stats(self, channel_ids, since):
+    def _iter_recent_video_stats(self, channel_ids, since):
         logging.info(
             f"fetching recent video stats for {len(channel_ids)} channels..."
         )
 
-        recent_videos = {}
-
         upload_playlists = self._get_upload_playlists(channel_ids)
+
+        def fetch(channel_id):
+            playlist_id = upload_playlists[channel_id]
+            if not playlist_id:
+                return channel_id, []
+
+            videos = self._get_recent_videos(playlist_id, since)
+            return channel_id, videos[playlist_id]
+
         with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = []
-            for channel_id in channel_ids:
-                playlist_id = upload_playlists[channel_id]
-                if playlist_id:
-                    futures.append(executor.submit(
-                        self._get_recent_videos, playlist_id, since
-                    ))
+            yield from bounded_map(executor, fetch, channel_ids, 20)
 
-            for future in as_completed(futures):
-                recent_videos.update(future.result())
+    def _summarize_recent_videos(self, videos, until, windows):
+        videos = sorted(videos)
 
-        return {
-            channel_id: (
-                {
-                    "videos_last_year": (
-                        len(recent_videos[upload_playlists[channel_id]])
-                    ),
-                    "last_video_date": datetime.isoformat(recent_videos[
-                        upload_playlists[channel_id]
-                    ][0]["published_at"])
-                }
-                if recent_videos[upload_playlists[channel_id]]
-                else
-                {
-                    "videos_last_year": 0,
-                    "last_video_date": ""
-                }
+        summary = {
+            f"videos_{days}d": (
+                len(videos) - bisect_right(videos, until - days * 86400)
             )
-            for channel_id in channel_ids
+            for days in windows
+        }
+        summary["uploads_per_week"] = round(
+            len(videos) * 7 / max(windows), 2
+        )
+
+        gaps = [b - a for a, b in zip(videos, videos[1:])]
+        summary["median_gap_days"] = (
+            round(median(gaps) / 86400, 1) if gaps else None
+        )
+
+        summary["last_video_date"] = (
+            datetime.fromtimestamp(videos[-1], timezone.utc).isoformat()
+            if videos
+            else ""
+        )
+
+        return summary
+
+    def _report_columns(self, windows):
+        return {
+            **self._REPORT_COLUMNS,
+            **{f"videos_{days}d": f"Videos/{days}d" for days in windows},
+            "uploads_per_week": "Uploads/Week",
+            "median_gap_days": "Median Gap (Days)",
+            "last_video_date": "Last Video",
         }
 
-    def _get_stats(self):
-        subscriptions = self._get()
-        channel_ids = tuple(s["channel_id"] for s in subscriptions)
+    def _iter_stats(self, windows):
+        subscriptions = {s["channel_id"]: s for s in self._get()}
+        channel_ids = tuple(subscriptions)
 
         channel_stats = self._get_channel_stats(channel_ids)
 
-        today = datetime.now(timezone.utc).replace(
+        today = int(datetime.now(timezone.utc).replace(
             hour=0, minute=0, second=0, microsecond=0
-        )
-        one_year_ago = (today - timedelta(days=365)).isoformat()
-        recent_video_stats = self._get_recent_video_stats(
-            channel_ids, one_year_ago
-        )
-
-        result = []
-        for s in subscriptions:
-            result.append({
+        ).timestamp())
+        since = today - max(windows) * 86400
+
+        for channel_id, videos in self._iter_recent_video_stats(
+            channel_ids, since
+        ):
+            s = subscriptions[channel_id]
+            yield {
                 "channel_id": s["channel_id"],
                 "channel_title": s["channel_title"],
                 "description": s["description"],
                 "thumbnail": s["thumbnail"],
-                **channel_stats[s["channel_id"]],
-                **recent_video_stats[s["channel_id"]]
-            })
-
-        return result
-
-    def _clean_text(self, text):
-        text = re.sub(r"\s+", " ", text.strip())
-        text = text[:77] + "..." if len(text) > 80 else text
-        text = text.replace("|", r"\|")
-        return text
-
-    def _convert_stats_to_markdown(self, stats):
-        headers = ["Thumbnail", "Channel", "Description", "Views", "Subscribers",
-                   "Videos", "Videos/Year", "Last Video"]
-        rows = [
-            f"| {' | '.join(headers)} |",
-            f"| {' | '.join(['---'] * len(headers))} |"
-        ]
-
-        for c in stats:
-            try:
-                last_video = datetime.fromisoformat(c["last_video_date"])
-            except ValueError:
-                last_video = datetime.fromtimestamp(0, tz=timezone.utc)
-            delta = datetime.now(timezone.utc) - last_video
-            days = delta.days
-            if days == 0:
-                relative = "Today"
-            elif days < 7:
-                relative = f"{days}d ago"
-            elif days < 30:
-                relative = f"{days // 7}w ago"
-            elif days < 365:
-                relative = f"{days // 30}mo ago"
-            else:
-                relative = f"{days // 365}y ago"
-
-            thumbnail = f"![{c['channel_title']}]({c['thumbnail']})"
-            desc = c["description"].replace("\n", " ")[:80] + "..."
-
-            row = [
-                thumbnail,
-                self._clean_text(c['channel_title']),
-                self._clean_text(desc),
-                f"{c['view_count']:,}",
-                f"{c['subscriber_count']:,}",
-                str(c["video_count"]),
-                str(c["videos_last_year"]),
-                relative,
-            ]
-            rows.append(f"| {' | '.join(row)} |")
-
-        return "\n".join(rows)
-
-    def generate_report(self, out_file):
-        stats = self._get_stats()
-        markdown_text = self._convert_stats_to_markdown(stats)
-
-        try:
-            output_path = Path(out_file)
-        except TypeError:
-            logging.info(f"writing markdown report to stdout...")
-            print(markdown_text)
-            return
-
-        logging.info(f"writing markdown report to {output_path}...")
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(markdown_text)
+                **channel_stats[channel_id],
+                **self._summarize_recent_videos(videos, today, windows)
+            }
+
+    def generate_report(self, out_file, fmt=None, windows=None):
+        windows = sorted(set(windows or self._DEFAULT_WINDOWS))
+
+        with build_report_writer(
+            out_file, self._report_columns(windows), fmt
+        ) as writer:
+            for row in self._iter_stats(windows):
+                writer.write_row(row)
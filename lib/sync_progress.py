@@ -0,0 +1,139 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from rich.console import Group
+from rich.table import Table
+from rich.text import Text
+
+
+def _format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} GiB"
+
+
+class SyncProgress:
+    def __init__(self):
+        self._repos = {}
+        self._in_flight = {}
+
+        self.discovered = 0
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.bytes_received = 0
+
+    def __repr__(self):
+        return (
+            f"SyncProgress(done={self.done}, "
+            f"in_flight={len(self._in_flight)}, failed={self.failed})"
+        )
+
+    def discover(self, repo_name):
+        self.discovered += 1
+        self._repos[repo_name] = {
+            "repo": repo_name,
+            "status": "pending",
+            "duration": None,
+            "operations": {},
+            "objects": 0,
+            "bytes": 0,
+        }
+
+    def start(self, repo_name):
+        self._repos[repo_name]["started"] = time.monotonic()
+        self._in_flight[repo_name] = ""
+
+    def skip(self, repo_name):
+        self._repos[repo_name]["status"] = "skipped"
+        self.skipped += 1
+
+    def finish(self, repo_name, success):
+        if repo_name not in self._in_flight:
+            return
+
+        record = self._repos[repo_name]
+        record["status"] = "ok" if success else "failed"
+        record["duration"] = time.monotonic() - record.pop("started")
+        self._in_flight.pop(repo_name, None)
+
+        if success:
+            self.done += 1
+        else:
+            self.failed += 1
+
+    @contextmanager
+    def timed(self, repo_name, operation):
+        self._in_flight[repo_name] = operation
+        start = time.monotonic()
+        try:
+            yield self._callback(repo_name)
+        finally:
+            self._repos[repo_name]["operations"][operation] = (
+                time.monotonic() - start
+            )
+
+    def _callback(self, repo_name):
+        record = self._repos[repo_name]
+        received = {"objects": 0, "bytes": 0}
+
+        def progress(update):
+            self._in_flight[repo_name] = (
+                f"{update['phase']} {update['percent'] or 0}%"
+            )
+            if update["done"]:
+                logging.debug(
+                    f"{repo_name}: {update['phase']} done "
+                    f"({update['current']})."
+                )
+
+            if update["phase"] != "Receiving objects":
+                return
+
+            objects = update["current"] - received["objects"]
+            size = (update["bytes"] or received["bytes"]) - received["bytes"]
+            received["objects"] += objects
+            received["bytes"] += size
+
+            record["objects"] += objects
+            record["bytes"] += size
+            self.bytes_received += size
+
+        return progress
+
+    def render(self):
+        table = Table(show_header=True, header_style="bold cyan")
+        table.add_column("Repo")
+        table.add_column("Operation")
+
+        for repo_name, operation in list(self._in_flight.items()):
+            table.add_row(repo_name, operation)
+
+        summary = Text(
+            f"done {self.done}/{self.discovered}, "
+            f"in flight {len(self._in_flight)}, failed {self.failed}, "
+            f"skipped {self.skipped}, "
+            f"received {_format_bytes(self.bytes_received)}"
+        )
+        return Group(summary, table)
+
+    def write_report(self, report_file):
+        records = sorted(
+            self._repos.values(),
+            key=lambda r: r["duration"] or 0,
+            reverse=True
+        )
+
+        with open(report_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "discovered": self.discovered,
+                "done": self.done,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "bytes_received": self.bytes_received,
+                "repos": records,
+            }, f, indent=2)
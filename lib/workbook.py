@@ -1,9 +1,37 @@
 import logging
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from .validation import is_url
 
 
+def _last_column(headers):
+    return chr(len(headers) - 1 + ord("A"))
+
+
+def _style_title(cell):
+    cell.font = Font(bold=True, size=11, color='FFFFFF')
+    cell.fill = PatternFill(
+        start_color='4472C4', end_color='4472C4', fill_type='solid'
+    )
+    cell.alignment = Alignment(horizontal='center')
+
+
+def _style_header(cell):
+    cell.font = Font(bold=True)
+    cell.fill = PatternFill(
+        start_color='D9E1F2', end_color='D9E1F2', fill_type='solid'
+    )
+
+
+def _style_value(cell, val):
+    if isinstance(val, str) and is_url(val):
+        display_val = val[:47] + "..." if len(val) > 50 else val
+        cell.value = display_val
+        cell.hyperlink = val
+        cell.style = "Hyperlink"
+
+
 def generate_workbook(tables, out_file):
     logging.info(f"generating workbook {out_file}")
     wb = Workbook()
@@ -13,35 +41,21 @@ def generate_workbook(tables, out_file):
 
     for table in tables:
         logging.debug(f"adding table {table['title']} to workbook")
-        sheet.merge_cells(
-            f'A{row}:{chr(len(table["headers"]) - 1 + ord("A"))}{row}'
-        )
+        sheet.merge_cells(f'A{row}:{_last_column(table["headers"])}{row}')
         header_cell = sheet[f'A{row}']
         header_cell.value = table['title']
-        header_cell.font = Font(bold=True, size=11, color='FFFFFF')
-        header_cell.fill = PatternFill(
-            start_color='4472C4', end_color='4472C4', fill_type='solid'
-        )
-        header_cell.alignment = Alignment(horizontal='center')
+        _style_title(header_cell)
         row += 1
 
         for col, col_name in enumerate(table['headers'], 1):
             cell = sheet.cell(row=row, column=col, value=col_name)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(
-                start_color='D9E1F2', end_color='D9E1F2', fill_type='solid'
-            )
+            _style_header(cell)
         row += 1
 
         for data_row in table['data']:
             for col, val in enumerate(data_row, 1):
                 cell = sheet.cell(row=row, column=col, value=val)
-
-                if isinstance(val, str) and is_url(val):
-                    display_val = val[:47] + "..." if len(val) > 50 else val
-                    cell.value = display_val
-                    cell.hyperlink = val
-                    cell.style = "Hyperlink"
+                _style_value(cell, val)
 
             row += 1
 
@@ -49,3 +63,36 @@ def generate_workbook(tables, out_file):
 
     logging.debug(f"saving workbook to {out_file}")
     wb.save(out_file)
+
+
+class TableWriter:
+    def __init__(self, out_file, title, headers):
+        self._out_file = out_file
+
+        self._wb = Workbook(write_only=True)
+        self._sheet = self._wb.create_sheet()
+
+        logging.info(f"streaming table {title} to workbook {out_file}")
+        self._sheet.merged_cells.add(f'A1:{_last_column(headers)}1')
+        title_cell = WriteOnlyCell(self._sheet, value=title)
+        _style_title(title_cell)
+        self._sheet.append([title_cell])
+
+        header_cells = []
+        for col_name in headers:
+            cell = WriteOnlyCell(self._sheet, value=col_name)
+            _style_header(cell)
+            header_cells.append(cell)
+        self._sheet.append(header_cells)
+
+    def append(self, data_row):
+        cells = []
+        for val in data_row:
+            cell = WriteOnlyCell(self._sheet, value=val)
+            _style_value(cell, val)
+            cells.append(cell)
+        self._sheet.append(cells)
+
+    def save(self):
+        logging.debug(f"saving workbook to {self._out_file}")
+        self._wb.save(self._out_file)
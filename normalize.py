@@ -2,7 +2,7 @@ import re
 import shutil
 from argparse import ArgumentParser
 from pathlib import Path
-from lib.filesystem import is_excluded
+from lib.filesystem import walk_tree
 
 
 def convert_to_kebab_case(source_string: str) -> str:
@@ -15,21 +15,35 @@ def get_contents(
     root: Path,
     parent: Path,
     recursive: bool,
-    exclude: list[str]
+    exclude: list[str],
+    list_workers: int = 1
 ) -> dict[str, None | dict]:
     contents = {}
-    for item in parent.iterdir():
-        if is_excluded(root, item, exclude):
-            continue
-
-        if item.is_dir():
-            contents[item.name] = (
-                get_contents(root, item, recursive, exclude)
-                if recursive
-                else {}
-            )
-        else:
-            contents[item.name] = None
+    nodes = {}
+
+    start = parent.relative_to(root).as_posix()
+    start = "" if start == "." else start
+
+    for relative_dir, entries in walk_tree(
+        root,
+        exclude,
+        start=start,
+        recursive=recursive,
+        follow_symlinks=True,
+        workers=list_workers
+    ):
+        node = nodes.pop(relative_dir, contents)
+
+        for entry in entries:
+            if entry.is_dir():
+                node[entry.name] = {}
+                nodes[
+                    f"{relative_dir}/{entry.name}"
+                    if relative_dir
+                    else entry.name
+                ] = node[entry.name]
+            else:
+                node[entry.name] = None
 
     return contents
 
@@ -107,11 +121,14 @@ def normalize(
     dry_run: bool,
     file_only: bool,
     recursive: bool,
-    exclude: list[str]
+    exclude: list[str],
+    list_workers: int = 1
 ) -> None:
     parent_path = Path(parent)
 
-    contents = get_contents(parent_path, parent_path, recursive, exclude)
+    contents = get_contents(
+        parent_path, parent_path, recursive, exclude, list_workers
+    )
     normalize_contents(parent_path, contents, dry_run, file_only)
 
 
@@ -146,7 +163,18 @@ def main() -> None:
         "--exclude",
         action="append",
         default=[],
-        help="exclude files or directories using glob pattern (repeatable)",
+        help=(
+            "exclude files or directories using glob pattern (repeatable), "
+            "'/pattern' anchors to the root, 'pattern/' matches directories"
+        ),
+    )
+
+    parser.add_argument(
+        "-w",
+        "--list-workers",
+        type=int,
+        default=1,
+        help="list directories in parallel (useful on network filesystems)"
     )
 
     args = parser.parse_args()
@@ -157,7 +185,8 @@ def main() -> None:
             args.dry_run,
             args.file_only,
             args.recursive,
-            args.exclude
+            args.exclude,
+            args.list_workers
         )
     except Exception as e:
         print(f"error: {e}")
@@ -1,19 +1,40 @@
 import hashlib
 import json
+import mmap
+import os
 import sys
 from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from lib.filesystem import is_excluded
+from lib.filesystem import walk_tree
+
+
+MMAP_THRESHOLD = 64 * 1024 * 1024
 
 
 def file_hash(
     path: Path,
     chunk_size: int = 1024 * 1024,
-    normalize: bool = True
+    normalize: bool = True,
+    mmap_threshold: int = MMAP_THRESHOLD
 ) -> str:
     h = hashlib.sha256()
 
     with path.open("rb") as f:
+        if not normalize:
+            size = os.fstat(f.fileno()).st_size
+            if size > 0 and size >= mmap_threshold:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    h.update(m)
+                return h.hexdigest()
+
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            while size := f.readinto(buffer):
+                h.update(view[:size])
+            return h.hexdigest()
+
         while chunk := f.read(chunk_size):
             if normalize:
                 chunk = chunk.replace(b"\r\n", b"\n")
@@ -27,61 +48,96 @@ def walk(
     path: Path,
     excludes: list[str],
     normalize: bool = False,
-    name_only: bool = False
+    name_only: bool = False,
+    list_workers: int = 1,
+    jobs: int = 1
 ) -> dict:
-    node = {
+    tree = {
         "type": "directory",
         "name": path.name or str(path),
         "children": [],
     }
+    nodes = {}
+
+    start = path.relative_to(root).as_posix()
+    start = "" if start == "." else start
+
+    executor = None
+    if jobs > 1 and not name_only:
+        executor = ThreadPoolExecutor(max_workers=jobs)
+    pending = deque()
+
+    def resolve(file_node, future):
+        file_node["sha256"] = future.result()
 
     try:
-        entries = sorted(path.iterdir(), key=lambda p: p.name)
-    except PermissionError:
-        print(f"permission denied: {path}", file=sys.stderr)
+        for relative_dir, entries in walk_tree(
+            root, excludes, start=start, workers=list_workers
+        ):
+            node = nodes.pop(relative_dir, tree)
+
+            for entry in entries:
+                if entry.is_symlink():
+                    node["children"].append({
+                        "type": "symlink",
+                        "name": entry.name,
+                        "target": Path(os.readlink(entry.path)).as_posix(),
+                    })
+                elif entry.is_dir(follow_symlinks=False):
+                    child = {
+                        "type": "directory",
+                        "name": entry.name,
+                        "children": [],
+                    }
+                    node["children"].append(child)
+                    nodes[
+                        f"{relative_dir}/{entry.name}"
+                        if relative_dir
+                        else entry.name
+                    ] = child
+                elif entry.is_file(follow_symlinks=False):
+                    file_node = {
+                        "type": "file",
+                        "name": entry.name,
+                    }
+                    if executor is not None:
+                        file_node["sha256"] = None
+                        pending.append((file_node, executor.submit(
+                            file_hash, Path(entry.path), normalize=normalize
+                        )))
+                        if len(pending) > jobs * 4:
+                            resolve(*pending.popleft())
+                    elif not name_only:
+                        file_node["sha256"] = file_hash(
+                            Path(entry.path), normalize=normalize
+                        )
+
+                    node["children"].append(file_node)
+                else:
+                    node["children"].append({
+                        "type": "other",
+                        "name": entry.name,
+                    })
+
+        while pending:
+            resolve(*pending.popleft())
+    except PermissionError as e:
+        print(f"permission denied: {e.filename}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
-    for entry in entries:
-        if is_excluded(root, entry, excludes):
-            continue
-
-        if entry.is_symlink():
-            node["children"].append({
-                "type": "symlink",
-                "name": entry.name,
-                "target": entry.readlink().as_posix(),
-            })
-        elif entry.is_dir():
-            node["children"].append(walk(
-                root,
-                entry,
-                excludes,
-                normalize=normalize,
-                name_only=name_only
-            ))
-        elif entry.is_file():
-            file_node = {
-                "type": "file",
-                "name": entry.name,
-            }
-            if not name_only:
-                file_node["sha256"] = file_hash(entry, normalize=normalize)
-
-            node["children"].append(file_node)
-        else:
-            node["children"].append({
-                "type": "other",
-                "name": entry.name,
-            })
-
-    return node
+    return tree
 
 
 def build_tree(
     root: Path,
     excludes: list[str],
     normalize: bool = False,
-    name_only: bool = False
+    name_only: bool = False,
+    list_workers: int = 1,
+    jobs: int = 1
 ) -> dict:
     if not root.is_dir():
         print(f"{root.name} is not a valid path", file=sys.stderr)
@@ -89,7 +145,15 @@ def build_tree(
 
     root = root.resolve()
 
-    return walk(root, root, excludes, normalize=normalize, name_only=name_only)
+    return walk(
+        root,
+        root,
+        excludes,
+        normalize=normalize,
+        name_only=name_only,
+        list_workers=list_workers,
+        jobs=jobs
+    )
 
 
 def main():
@@ -103,7 +167,10 @@ def main():
         "--exclude",
         action="append",
         default=[],
-        help="exclude files or directories using glob pattern (repeatable)",
+        help=(
+            "exclude files or directories using glob pattern (repeatable), "
+            "'/pattern' anchors to the root, 'pattern/' matches directories"
+        ),
     )
     parser.add_argument(
         "-n",
@@ -117,6 +184,20 @@ def main():
         action="store_true",
         help="output names only without file hashes"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="hash files on this many threads while walking"
+    )
+    parser.add_argument(
+        "-w",
+        "--list-workers",
+        type=int,
+        default=1,
+        help="list directories in parallel (useful on network filesystems)"
+    )
 
     args = parser.parse_args()
 
@@ -125,7 +206,9 @@ def main():
         path,
         args.exclude,
         args.normalize,
-        args.name_only
+        args.name_only,
+        args.list_workers,
+        args.jobs
     ))
     print(output)
 
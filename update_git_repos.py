@@ -1,20 +1,23 @@
 import asyncio
+import json
 import logging
 import os
 import re
 import shutil
+import sys
 from argparse import ArgumentParser
-from git import Repo
-from git.exc import NoSuchPathError, InvalidGitRepositoryError
+from contextlib import contextmanager
+from itertools import chain
 from pathlib import Path
-from lib.forge.github.client import GithubClient
-from lib.forge.github.repos import GithubRepos
+from urllib.parse import urlsplit
+from rich.live import Live
+from lib import async_git
+from lib.concurrency import AdaptiveLimiter
+from lib.forge.factory import Factory
 from lib.logging_util import setup_logger
+from lib.sync_progress import SyncProgress
 
-semaphore = asyncio.Semaphore(10)
-
-logging.getLogger("git").setLevel(logging.WARNING)
-logging.getLogger("git.cmd").setLevel(logging.WARNING)
+PUSHED_AT_PROPS = {"github": "pushed_at", "gitea": "updated_at"}
 
 
 def init_logger():
@@ -33,57 +36,283 @@ async def get_repo_url(repo, ssh_host=None, use_ssh=None):
     return repo["ssh_url"] if use_ssh else repo["clone_url"]
 
 
-def _update_local_clone(repo_name, repo_path, repo_url):
-    repo_obj = None
-    try:
-        repo_obj = Repo(repo_path)
-    except NoSuchPathError:
+def url_host(url):
+    if "://" in url:
+        return urlsplit(url).hostname
+
+    return url.split("@")[-1].split(":")[0]
+
+
+def source_repo_urls(source, use_ssh, nested, visibility=None, username=None):
+    forge, _, owner = source.partition(":")
+
+    kwargs = {}
+    if owner:
+        kind, _, name = owner.partition("/")
+        if forge != "github" or kind not in ("users", "orgs") or not name:
+            raise ValueError(f"unsupported source: {source}")
+        kwargs = {"username": name} if kind == "users" else {"org": name}
+        kwargs["visibility"] = visibility
+    elif forge == "github":
+        kwargs = {"username": username, "visibility": visibility}
+
+    url_prop = "ssh_url" if use_ssh else "clone_url"
+    pushed_at_prop = PUSHED_AT_PROPS.get(forge)
+    props = ["name", "full_name", url_prop, pushed_at_prop]
+
+    repos = Factory(forge, use_cache=False).build_repos(props, **kwargs)
+    for repo in repos.get():
+        name = repo["name"]
+        if nested:
+            name = os.path.join(url_host(repo[url_prop]), repo["full_name"])
+
+        yield [name, repo[url_prop], repo[pushed_at_prop]]
+
+
+def clone_options(clone_mode, depth):
+    if clone_mode == "blobless":
+        return ["--filter=blob:none"]
+    elif clone_mode == "shallow":
+        return [f"--depth={depth}", "--no-single-branch"]
+
+    return []
+
+
+def fetch_options(clone_mode, depth, shallow):
+    if clone_mode == "shallow" and shallow:
+        return ["--prune", f"--depth={depth}"]
+
+    return ["--prune"]
+
+
+def load_state(state_file):
+    if state_file is None or not state_file.exists():
+        return {}
+
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state_file, state):
+    if state_file is None:
+        return
+
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+@contextmanager
+def live_view(progress):
+    console_handlers = [
+        h for h in logging.getLogger().handlers
+        if type(h) is logging.StreamHandler
+    ]
+
+    with Live(progress.render(), auto_refresh=False) as live:
+        streams = [h.setStream(sys.stdout) for h in console_handlers]
+        try:
+            yield live
+        finally:
+            for handler, stream in zip(console_handlers, streams):
+                handler.setStream(stream)
+
+
+async def refresh_live_view(live, progress, interval=0.5):
+    while True:
+        live.update(progress.render(), refresh=True)
+        await asyncio.sleep(interval)
+
+
+async def _remote_unchanged(repo_path, remote):
+    remote_refs = {}
+    for sha, ref in await async_git.ls_remote(
+        repo_path, remote, "--heads", "--tags"
+    ):
+        if ref.startswith("refs/heads/"):
+            ref = f"refs/remotes/{remote}/{ref[len('refs/heads/'):]}"
+        if not ref.endswith("^{}"):
+            remote_refs[ref] = sha
+
+    local_refs = {}
+    for line in await async_git.for_each_ref(
+        repo_path, "%(objectname)\t%(refname)",
+        f"refs/remotes/{remote}/", "refs/tags/"
+    ):
+        sha, ref = line.split("\t", 1)
+        local_refs[ref] = sha
+
+    stale_branches = {
+        ref for ref in local_refs
+        if ref.startswith("refs/remotes/") and
+        ref != f"refs/remotes/{remote}/HEAD" and
+        ref not in remote_refs
+    }
+    return not stale_branches and all(
+        local_refs.get(ref) == sha for ref, sha in remote_refs.items()
+    )
+
+
+async def _update_local_clone(
+    repo_name, repo_path, repo_url, options, progress
+):
+    if not os.path.exists(repo_path):
         logging.info(f"{repo_name}: Cloning repo.")
-        repo_obj = Repo.clone_from(repo_url, repo_path)
-    except InvalidGitRepositoryError:
+        with progress.timed(repo_name, "clone") as callback:
+            await async_git.clone(
+                repo_url, repo_path, *options["clone"], progress=callback
+            )
+        logging.info(f"{repo_name}: Successfully cloned.")
+        return True
+
+    if not await async_git.is_repo(repo_path):
         logging.warning(
             f"{repo_name}: Directory {repo_path} exists but is not a repo. "
             f"Re-cloning."
         )
-        shutil.rmtree(repo_path)
-        repo_obj = Repo.clone_from(repo_url, repo_path)
+        await asyncio.to_thread(shutil.rmtree, repo_path)
+        with progress.timed(repo_name, "clone") as callback:
+            await async_git.clone(
+                repo_url, repo_path, *options["clone"], progress=callback
+            )
+        logging.info(f"{repo_name}: Successfully cloned.")
+        return True
+
+    shallow = (
+        options["clone_mode"] == "shallow" and
+        await async_git.is_shallow(repo_path)
+    )
+    fetch = fetch_options(options["clone_mode"], options["depth"], shallow)
 
+    success = True
     logging.info(f"{repo_name}: Fetching latest changes.")
-    for remote in repo_obj.remotes:
+    for remote in await async_git.remotes(repo_path):
         try:
+            if options["skip_unchanged"] and await _remote_unchanged(
+                repo_path, remote
+            ):
+                logging.info(f"{repo_name}: Remote {remote} is unchanged.")
+                continue
+
             logging.info(f"{repo_name}: Updating remote {remote}.")
-            remote.fetch()
-        except Exception as e:
+            with progress.timed(repo_name, f"fetch {remote}") as callback:
+                await async_git.fetch(
+                    repo_path, remote, *fetch,
+                    refspecs=options["refspecs"], progress=callback
+                )
+        except async_git.GitError as e:
+            success = False
             logging.error(f"{repo_name}: Error updating {remote}: {e}.")
 
     logging.info(f"{repo_name}: Successfully updated.")
+    return success
 
 
-async def update_local_clone(repo_name, repo_path, repo_url):
-    async with semaphore:
-        await asyncio.to_thread(
-            _update_local_clone,
-            repo_name,
-            repo_path,
-            repo_url
-        )
+async def update_local_clone(
+    limiter, repo_name, repo_path, repo_url, pushed_at, options, state,
+    progress
+):
+    progress.discover(repo_name)
+    if (
+        pushed_at and state.get(repo_name) == pushed_at and
+        os.path.isdir(repo_path)
+    ):
+        logging.info(f"{repo_name}: Not pushed since last sync, skipping.")
+        progress.skip(repo_name)
+        return
 
+    success = False
+    try:
+        async with limiter:
+            progress.start(repo_name)
+            success = await _update_local_clone(
+                repo_name, repo_path, repo_url, options, progress
+            )
+            limiter.record(success)
+
+        if success and pushed_at:
+            state[repo_name] = pushed_at
+    except Exception as e:
+        logging.error(f"{repo_name}: Error updating repo: {e}.")
+    finally:
+        progress.finish(repo_name, success)
+
+
+async def iterate_in_thread(iterable):
+    iterator = iter(iterable)
+    sentinel = object()
+    while (
+        item := await asyncio.to_thread(next, iterator, sentinel)
+    ) is not sentinel:
+        yield item
 
-async def update_local_clones(repos_dir, repo_urls):
+
+async def update_local_clones(
+    repos_dir, sources, options, jobs, max_jobs, state, progress
+):
+    limiters = {}
     tasks = []
-    for name, url in repo_urls:
-        repo_path = os.path.join(repos_dir, name)
+    repo_paths = set()
+
+    async def schedule(repo_urls):
+        async for name, url, pushed_at in iterate_in_thread(repo_urls):
+            repo_path = os.path.join(repos_dir, name)
+            if repo_path in repo_paths:
+                logging.debug(f"{name}: Already listed by another source.")
+                continue
+            repo_paths.add(repo_path)
+
+            host = url_host(url)
+            if host not in limiters:
+                limiters[host] = AdaptiveLimiter(jobs, maximum=max_jobs)
 
-        tasks.append(update_local_clone(name, repo_path, url))
+            tasks.append(asyncio.create_task(update_local_clone(
+                limiters[host], name, repo_path, url, pushed_at, options,
+                state, progress
+            )))
 
+    listings = await asyncio.gather(
+        *(schedule(repo_urls) for repo_urls in sources),
+        return_exceptions=True
+    )
     await asyncio.gather(*tasks)
 
+    for host, limiter in limiters.items():
+        logging.info(f"{host}: Finished with concurrency {limiter.limit}.")
+    logging.info(
+        f"Finished: {progress.done} updated, {progress.failed} failed, "
+        f"{progress.skipped} skipped."
+    )
+
+    for error in listings:
+        if isinstance(error, BaseException):
+            raise error
+
+
+async def sync_with_live_view(update, progress):
+    with live_view(progress) as live:
+        refresh = asyncio.create_task(refresh_live_view(live, progress))
+        try:
+            await update
+        finally:
+            refresh.cancel()
+            live.update(progress.render(), refresh=True)
+
 
 async def main():
     init_logger()
 
     try:
         parser = ArgumentParser()
+        parser.add_argument(
+            "-f",
+            "--source",
+            action="append",
+            dest="sources",
+            help=(
+                "Forge to mirror: 'github', 'github:users/NAME', "
+                "'github:orgs/NAME' or 'gitea' (can be repeated)"
+            )
+        )
         parser.add_argument(
             "-v",
             "--visibility",
@@ -106,25 +335,104 @@ async def main():
             action="store_true",
             help="Print discovered repo URLs without cloning/updating"
         )
+        parser.add_argument(
+            "-m",
+            "--clone-mode",
+            choices=["full", "blobless", "shallow"],
+            default="full",
+            help="Clone full history, without blobs, or shallow"
+        )
+        parser.add_argument(
+            "-d",
+            "--depth",
+            type=int,
+            default=1,
+            help="History depth for shallow clones and fetches"
+        )
+        parser.add_argument(
+            "-r",
+            "--refspec",
+            action="append",
+            dest="refspecs",
+            help="Limit fetches to this refspec (can be repeated)"
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=10,
+            help="Initial number of concurrent clones/fetches per host"
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=64,
+            help="Upper bound for each host's adaptive concurrency limit"
+        )
+        parser.add_argument(
+            "-s",
+            "--skip-unchanged",
+            action="store_true",
+            help="Skip fetching remotes whose ls-remote tips match local refs"
+        )
+        parser.add_argument(
+            "--state-file",
+            type=Path,
+            help="JSON file of pushed_at times to skip repos not pushed to"
+        )
+        parser.add_argument(
+            "-p",
+            "--progress",
+            action="store_true",
+            help="Show a live view of in-flight clones and fetches"
+        )
+        parser.add_argument(
+            "--report",
+            type=Path,
+            help="Write per-repo timings and transfer sizes as JSON"
+        )
         parser.add_argument(
             "repos_dir",
             help="Directory to clone/update repos into"
         )
         args = parser.parse_args()
 
-        props = ["name", "clone_url"]
-        if args.use_ssh:
-            props = ["name", "ssh_url"]
-
-        client = GithubClient()
-        gh_repos = GithubRepos(client, args.visibility, args.username, props)
-        repo_urls = [[i[props[0]], i[props[1]]] for i in gh_repos.get()]
+        source_names = args.sources or ["github"]
+        sources = [
+            source_repo_urls(
+                source, args.use_ssh, len(source_names) > 1,
+                args.visibility, args.username
+            )
+            for source in source_names
+        ]
 
         if args.dry_run:
             logging.info("Dry run mode - discovered repo URLs:")
-            logging.info(repo_urls)
+            logging.info(list(chain.from_iterable(sources)))
         else:
-            await update_local_clones(args.repos_dir, repo_urls)
+            options = {
+                "clone": clone_options(args.clone_mode, args.depth),
+                "clone_mode": args.clone_mode,
+                "depth": args.depth,
+                "refspecs": args.refspecs,
+                "skip_unchanged": args.skip_unchanged,
+            }
+
+            state = load_state(args.state_file)
+            progress = SyncProgress()
+            update = update_local_clones(
+                args.repos_dir, sources, options, args.jobs,
+                args.max_jobs, state, progress
+            )
+            try:
+                if args.progress:
+                    await sync_with_live_view(update, progress)
+                else:
+                    await update
+            finally:
+                save_state(args.state_file, state)
+                if args.report:
+                    progress.write_report(args.report)
     except Exception as e:
         logging.critical(f"error while updating git repos: {e}", exc_info=True)
 
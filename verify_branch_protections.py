@@ -2,6 +2,8 @@ import logging
 from argparse import ArgumentParser
 from pathlib import Path
 from lib.forge.factory import Factory
+from lib.forge.policy import Policy, format_finding
+from lib.forge.results import JsonLinesWriter, ResultsStore, diff_findings
 from lib.logging_util import setup_logger
 
 
@@ -14,6 +16,52 @@ def init_logger():
     logging.getLogger()
 
 
+def report(forge, branch_protections, store, writer, diff):
+    previous = store.latest(forge) if store else {}
+    run_id = store.begin(forge) if store else None
+
+    seen = set()
+    for repo, repo_fingerprint, findings in branch_protections.results():
+        seen.add(repo)
+        if store:
+            store.record(run_id, repo, repo_fingerprint, findings)
+
+        last_fingerprint, last_findings = previous.get(repo, (None, []))
+        if diff and repo_fingerprint == last_fingerprint:
+            logging.debug(f"skipping unchanged repo '{repo}'")
+            continue
+
+        if diff:
+            added, resolved = diff_findings(last_findings, findings)
+            if not added and not resolved:
+                continue
+        else:
+            added, resolved = findings, []
+
+        logging.info(f"verified repo '{repo}'")
+        for finding in added:
+            logging.info(format_finding(finding))
+        for finding in resolved:
+            logging.info(f"resolved: {format_finding(finding)}")
+
+        if writer:
+            writer.write({
+                "repo": repo,
+                "fingerprint": repo_fingerprint,
+                "findings": added,
+                "resolved": resolved,
+            })
+
+    if diff:
+        for repo in previous.keys() - seen:
+            logging.info(f"repo '{repo}' no longer present")
+            if writer:
+                writer.write({"repo": repo, "removed": True})
+
+    if store:
+        store.complete(run_id)
+
+
 def main():
     init_logger()
 
@@ -25,13 +73,71 @@ def main():
         type=str,
         help="name of the forge to check branch protections for"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=8,
+        help="number of repos to verify concurrently"
+    )
+    parser.add_argument(
+        "-p",
+        "--policy",
+        type=Path,
+        help="policy file (yaml or json) overriding the forge's default"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="disable the conditional http response cache"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="write per repo results as json lines to this file"
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        help="sqlite database keeping the results of every run"
+    )
+    parser.add_argument(
+        "-d",
+        "--diff",
+        action="store_true",
+        help="only report changes since the previous run recorded in --db"
+    )
     args = parser.parse_args()
 
+    if args.diff and not args.db:
+        parser.error("--diff requires --db")
+
+    store = None
     try:
-        Factory(args.forge).build_branch_protections().verify()
+        policy = Policy.load(args.policy) if args.policy else None
+        branch_protections = Factory(
+            args.forge, not args.no_cache
+        ).build_branch_protections(args.jobs, policy)
+
+        if not (args.output or args.db):
+            branch_protections.verify()
+            return
+
+        store = ResultsStore(args.db) if args.db else None
+        if args.output:
+            with JsonLinesWriter(args.output) as writer:
+                report(
+                    args.forge, branch_protections, store, writer, args.diff
+                )
+        else:
+            report(args.forge, branch_protections, store, None, args.diff)
     except Exception as e:
         logging.critical(
             f"error verifying branch protections: {e}", exc_info=True)
+    finally:
+        if store:
+            store.close()
 
 
 if __name__ == '__main__':